@@ -8,10 +8,36 @@ This module defines fundamental types:
 from __future__ import annotations
 
 import fnmatch
+import functools
+import re
 from dataclasses import dataclass, field
 from typing import Any
 
 
+@functools.lru_cache(maxsize=4096)
+def _compile_pattern(pattern: str) -> re.Pattern[str]:
+    """Compile a glob-like resource pattern to a regex, cached by pattern string."""
+    return re.compile(fnmatch.translate(pattern.replace("**", "*")))
+
+
+_GLOB_CHARS = frozenset("*?[")
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile_alternation(patterns: tuple[str, ...]) -> re.Pattern[str] | frozenset[str] | None:
+    """Compile a pattern list into a single matcher, cached by the tuple.
+
+    Wildcard-free pattern lists become a frozenset (membership test);
+    everything else becomes one alternation regex. Returns None for an
+    empty pattern list (matches nothing).
+    """
+    if not patterns:
+        return None
+    if not any(_GLOB_CHARS.intersection(p) for p in patterns):
+        return frozenset(patterns)
+    return re.compile("|".join(fnmatch.translate(p.replace("**", "*")) for p in patterns))
+
+
 @dataclass
 class CapabilityContract:
     """What a capability declares it might do.
@@ -48,6 +74,16 @@ class CapabilityContract:
     spawns: bool = False
     """Whether this capability might create sub-capabilities or agents."""
 
+    def __post_init__(self) -> None:
+        # Fixed lookup table so covers() does a dict access instead of a
+        # defaulted getattr on every permission check.
+        self._by_type = {
+            "reads": self.reads,
+            "writes": self.writes,
+            "executes": self.executes,
+            "network": self.network,
+        }
+
     def __str__(self) -> str:
         """Human-readable summary of the contract."""
         parts = []
@@ -73,13 +109,19 @@ class CapabilityContract:
         Returns:
             True if the contract allows access to this resource.
         """
-        patterns = getattr(self, resource_type, [])
-        return any(self._matches_pattern(pattern, resource) for pattern in patterns)
+        patterns = self._by_type.get(resource_type)
+        if not patterns:
+            return False
+        compiled = _compile_alternation(tuple(patterns))
+        if compiled is None:
+            return False
+        if isinstance(compiled, frozenset):
+            return resource in compiled
+        return compiled.match(resource) is not None
 
     def _matches_pattern(self, pattern: str, resource: str) -> bool:
         """Check if a resource matches a pattern."""
-        fnmatch_pattern = pattern.replace("**", "*")
-        return fnmatch.fnmatch(resource, fnmatch_pattern)
+        return _compile_pattern(pattern).match(resource) is not None
 
     def merge(self, other: "CapabilityContract") -> "CapabilityContract":
         """Merge two contracts, taking the union of all permissions."""
@@ -92,7 +134,7 @@ class CapabilityContract:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class ExecutionResult:
     """Result of executing code in the REPL."""
 
@@ -114,6 +156,21 @@ class ExecutionResult:
     error_message: str | None = None
     """Error message if execution failed."""
 
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to a JSON-serializable dict.
+
+        All fields are flat, so this is a shallow copy — unlike
+        dataclasses.asdict, which recurses (and deep-copies) every value.
+        """
+        return {
+            "success": self.success,
+            "stdout": self.stdout,
+            "stderr": self.stderr,
+            "return_value": self.return_value,
+            "error_type": self.error_type,
+            "error_message": self.error_message,
+        }
+
     def __str__(self) -> str:
         """Format as readable output."""
         if self.success:
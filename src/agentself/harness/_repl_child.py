@@ -0,0 +1,910 @@
+"""REPL child process: executes code and speaks the framed IPC protocol.
+
+Spawned by REPLSubprocess / AsyncREPLSubprocess, which run this file
+(or its precompiled .pyc) directly by path — not via -m, which would
+import the full agentself package into every child. Each message is a
+4-byte little-endian length prefix plus an orjson/json payload; execute
+results append captured stdout/stderr as raw bytes after the frame.
+"""
+
+
+import ast
+import inspect
+import itertools
+import json
+import linecache
+import struct
+import sys
+import traceback
+from collections import deque
+from contextlib import redirect_stderr, redirect_stdout
+from functools import lru_cache
+
+try:
+    import orjson
+
+    def _dumps(obj):
+        return orjson.dumps(obj)
+
+    _loads = orjson.loads
+except ImportError:
+    orjson = None
+
+    def _dumps(obj):
+        return json.dumps(obj).encode("utf-8")
+
+    _loads = json.loads
+
+def _write_msg(buf, obj):
+    """Write one length-prefixed message and flush."""
+    payload = _dumps(obj)
+    buf.writelines((struct.pack("<I", len(payload)), payload))
+    buf.flush()
+
+@lru_cache(maxsize=None)
+def _cached_source(obj):
+    """Source for a function or class, or None; cached by identity.
+
+    Objects defined through _execute carry their exact source as a
+    __source__ attribute, which is a plain dict lookup. Everything else
+    falls back to inspect.getsource, which walks the source cache and
+    allocates heavily; either way the result only changes when the name
+    is redefined — which creates a new object and a new cache entry.
+    """
+    source = getattr(obj, "__source__", None)
+    if source is not None:
+        return source
+    try:
+        return inspect.getsource(obj)
+    except (OSError, TypeError):
+        return None
+
+@lru_cache(maxsize=None)
+def _cached_sig(fn):
+    """Signature string for a callable, cached by object identity.
+
+    Redefining a function creates a new object, so stale entries never
+    serve wrong answers; _inject clears the cache to drop dead objects.
+    """
+    explicit = getattr(fn, "__signature__", None)
+    if explicit is not None:
+        return str(explicit)
+    return str(inspect.signature(fn))
+
+def _write_execute_result(buf, result):
+    """Write an execute result with stdout/stderr as raw bytes.
+
+    The JSON header carries byte lengths; the captured streams follow
+    the frame unescaped, so large prints skip JSON string encoding.
+    """
+    out = result.pop("stdout", "").encode("utf-8")
+    err = result.pop("stderr", "").encode("utf-8")
+    result["stdout_len"] = len(out)
+    result["stderr_len"] = len(err)
+    header = _dumps(result)
+    # Separate writes avoid concatenating the large streams into one
+    # new bytes object; the single flush still yields one syscall per
+    # message when everything fits the pipe buffer.
+    buf.write(struct.pack("<I", len(header)) + header)
+    if out:
+        buf.write(out)
+    if err:
+        buf.write(err)
+    buf.flush()
+
+def _read_msg(buf):
+    """Read one length-prefixed message; None at EOF."""
+    header = buf.read(4)
+    if len(header) < 4:
+        return None
+    (length,) = struct.unpack("<I", header)
+    return _loads(buf.read(length))
+
+# Names rebound since the last state snapshot. exec() with a dict
+# subclass routes top-level stores through __setitem__ (STORE_NAME
+# falls back to PyObject_SetItem for non-exact dicts), so assignments
+# in user code are tracked without scanning the whole namespace.
+_dirty = set()
+
+class _Namespace(dict):
+    """Namespace dict that records rebound/deleted names."""
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        _dirty.add(key)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        _dirty.add(key)
+
+# Namespace for user code
+_namespace = _Namespace({"__builtins__": __builtins__})
+
+# History of executed code blocks
+_history = []
+
+# Registered capabilities (native Python)
+_capabilities = {}
+
+# Relay capabilities (MCP-backed)
+_relay_capabilities = {}
+
+# Counter for relay request IDs
+_relay_id = 0
+
+def _serialize_py(value):
+    """Serialize a value to JSON-compatible format (Python recursion)."""
+    if value is None:
+        return None
+    if isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple)):
+        try:
+            return [_serialize_py(v) for v in value]
+        except Exception:
+            return repr(value)
+    if isinstance(value, dict):
+        try:
+            return {str(k): _serialize_py(v) for k, v in value.items()}
+        except Exception:
+            return repr(value)
+    # For objects, return a useful representation
+    return repr(value)
+
+if orjson is not None:
+    def _serialize(value):
+        """Normalize a return value to JSON-compatible data in C.
+
+        One orjson encode (repr for unsupported objects, stringified
+        non-str keys) plus decode replaces the element-by-element
+        Python recursion for container results.
+        """
+        try:
+            return _loads(orjson.dumps(
+                value, default=repr, option=orjson.OPT_NON_STR_KEYS,
+            ))
+        except orjson.JSONEncodeError:
+            return _serialize_py(value)
+else:
+    _serialize = _serialize_py
+
+
+if orjson is not None:
+    def _probe_json(value):
+        """True if value encodes as JSON, probed on orjson's C path."""
+        try:
+            orjson.dumps(value)
+            return True
+        except orjson.JSONEncodeError:
+            return False
+else:
+    def _probe_json(value):
+        """True if value encodes as JSON (stdlib fallback)."""
+        try:
+            json.dumps(value)
+            return True
+        except (TypeError, ValueError):
+            return False
+
+# Common scalar types resolve with one dict lookup instead of the
+# isinstance chain below.
+_SCALAR_TYPE_NAMES = {
+    int: "int",
+    float: "float",
+    str: "str",
+    bool: "bool",
+    bytes: "bytes",
+    type(None): "NoneType",
+}
+
+def _get_type_str(value):
+    """Get a string representation of a value's type."""
+    name = _SCALAR_TYPE_NAMES.get(type(value))
+    if name is not None:
+        return name
+    t = type(value).__name__
+    if isinstance(value, (list, tuple)) and value:
+        inner = type(value[0]).__name__
+        return f"{t}[{inner}, ...]" if len(value) > 1 else f"{t}[{inner}]"
+    if isinstance(value, dict) and value:
+        k, v = next(iter(value.items()))
+        return f"dict[{type(k).__name__}, {type(v).__name__}]"
+    return t
+
+def _relay(capability: str, method: str, kwargs: dict):
+    """Relay a capability call to the harness.
+
+    This function sends a relay request to the harness and waits for the response.
+    It's used by RelayCapability objects to call MCP server tools.
+    """
+    global _relay_id
+    _relay_id += 1
+    request_id = f"relay_{_relay_id}"
+
+    # Send relay request to harness (via stdout)
+    request = {
+        "type": "relay_request",
+        "id": request_id,
+        "capability": capability,
+        "method": method,
+        "kwargs": kwargs,
+    }
+    # Use the real stdout (not captured)
+    _write_msg(sys.__stdout__.buffer, request)
+
+    # Wait for response on stdin
+    response = _read_msg(sys.__stdin__.buffer)
+    if response is None:
+        raise RuntimeError("Harness closed connection during relay")
+
+    if response.get("type") != "relay_response":
+        raise RuntimeError(f"Unexpected response type: {response.get('type')}")
+    if response.get("id") != request_id:
+        raise RuntimeError(f"Response ID mismatch: expected {request_id}")
+
+    if response.get("success"):
+        return response.get("result")
+    else:
+        raise RuntimeError(f"Relay call failed: {response.get('error')}")
+
+class RelayCapability:
+    """A capability backed by an MCP server.
+
+    Method calls are relayed to the harness, which forwards them to
+    the backend MCP server.
+    """
+
+    def __init__(self, name: str, tools: dict):
+        self._name = name
+        self._tools = tools  # {method_name: {description: str, parameters: dict}}
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def description(self):
+        return f"MCP-backed capability with {len(self._tools)} tools"
+
+    def __getattr__(self, method: str):
+        if method.startswith("_"):
+            raise AttributeError(method)
+        if method not in self._tools:
+            available = ", ".join(self._tools.keys())
+            raise AttributeError(
+                f"'{self._name}' has no method '{method}'. "
+                f"Available: {available}"
+            )
+
+        def call(**kwargs):
+            return _relay(self._name, method, kwargs)
+
+        # Copy metadata
+        tool = self._tools[method]
+        call.__name__ = method
+        call.__doc__ = tool.get("description", "")
+        return call
+
+    def __repr__(self):
+        return f"<RelayCapability '{self._name}' with {len(self._tools)} methods>"
+
+    def __dir__(self):
+        return list(self._tools.keys()) + ["name", "description", "describe"]
+
+    def describe(self) -> str:
+        """Return documentation for this capability."""
+        lines = [f"{self._name} capability (MCP-backed):", ""]
+        for method, tool in self._tools.items():
+            desc = tool.get("description", "No description")
+            lines.append(f"  .{method}()")
+            lines.append(f"      {desc}")
+            lines.append("")
+        return "\n".join(lines)
+
+# Make RelayCapability available in namespace
+_namespace["RelayCapability"] = RelayCapability
+_namespace["_relay"] = _relay
+
+_repl_file_ids = itertools.count()
+
+
+@lru_cache(maxsize=256)
+def _compile_code(code):
+    """Compile a snippet once per distinct source string.
+
+    One parse decides expression vs statements: a lone expression
+    compiles in eval mode (so its value can be returned), everything
+    else in exec mode. Top-level def/class names and their exact source
+    segments are extracted from the same parse so _execute can index
+    and tag definitions without re-parsing. Replayed snippets skip
+    parse+compile entirely.
+
+    Each snippet compiles under a unique synthetic filename that is
+    registered in linecache, so inspect.getsource works directly on
+    REPL-defined functions and classes (and tracebacks show source).
+    """
+    filename = f"<repl-{next(_repl_file_ids)}>"
+    linecache.cache[filename] = (
+        len(code), None, code.splitlines(keepends=True), filename,
+    )
+    tree = ast.parse(code, filename)
+    if len(tree.body) == 1 and isinstance(tree.body[0], ast.Expr):
+        expr = ast.Expression(tree.body[0].value)
+        return "eval", compile(expr, filename, "eval"), ()
+    lines = code.splitlines(keepends=True)
+    defs = tuple(
+        (
+            "class" if isinstance(node, ast.ClassDef) else "def",
+            node.name,
+            _def_segment(code, lines, node),
+        )
+        for node in tree.body
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))
+    )
+    return "exec", compile(tree, filename, "exec"), defs
+
+
+def _def_segment(code, lines, node):
+    """Source for a top-level def/class, decorators included.
+
+    ast.get_source_segment starts at the def/class keyword, which
+    drops decorators; for decorated definitions slice full lines from
+    the first decorator instead (top-level nodes sit at column 0, so
+    whole lines are exactly the definition).
+    """
+    if node.decorator_list:
+        start = node.decorator_list[0].lineno - 1
+        return "".join(lines[start:node.end_lineno])
+    return ast.get_source_segment(code, node)
+
+class _CappedIO:
+    """Text sink that bounds captured output with head/tail retention.
+
+    Keeps up to `cap` characters of head and `tail` characters of
+    tail; the middle of runaway output is dropped and reported as a
+    truncation marker by getvalue(). Bounds worst-case IPC payloads.
+    """
+
+    def __init__(self, cap=1 << 20, tail=1 << 14):
+        self.cap = cap
+        self.tail = tail
+        self.reset()
+
+    def reset(self):
+        self._head = []
+        self._head_len = 0
+        self._tail_chunks = deque()
+        self._tail_len = 0
+        self._dropped = 0
+
+    def write(self, s):
+        n = len(s)
+        if self._head_len < self.cap:
+            room = self.cap - self._head_len
+            if n <= room:
+                self._head.append(s)
+                self._head_len += n
+                return n
+            self._head.append(s[:room])
+            self._head_len = self.cap
+            s = s[room:]
+
+        self._tail_chunks.append(s)
+        self._tail_len += len(s)
+        while self._tail_len > self.tail and len(self._tail_chunks) > 1:
+            dropped = self._tail_chunks.popleft()
+            self._tail_len -= len(dropped)
+            self._dropped += len(dropped)
+        if self._tail_len > self.tail:
+            chunk = self._tail_chunks.popleft()
+            kept = chunk[-self.tail:]
+            self._dropped += len(chunk) - len(kept)
+            self._tail_chunks.append(kept)
+            self._tail_len = len(kept)
+        return n
+
+    def flush(self):
+        pass
+
+    def getvalue(self):
+        if not self._tail_len:
+            return "".join(self._head)
+        parts = self._head + list(self._tail_chunks)
+        if self._dropped:
+            marker = "\n...<{} chars truncated>...\n".format(self._dropped)
+            parts = self._head + [marker] + list(self._tail_chunks)
+        return "".join(parts)
+
+# Capture buffers reused across _execute calls; reset between runs
+# instead of reallocated.
+_stdout_capture = _CappedIO()
+_stderr_capture = _CappedIO()
+
+# Last execution failure, kept unformatted until someone asks.
+_last_exc = [None]
+
+def _snapshot() -> dict:
+    """Build state, capability, and export views in one roundtrip.
+
+    The state view reads the incremental caches and the export walk
+    hits the memoized source/signature lookups, so fusing the three
+    requests costs one namespace walk total.
+    """
+    return {
+        "state": _get_state(),
+        "capabilities": _list_capabilities(),
+        "export": _export_state(),
+    }
+
+
+def _reset() -> dict:
+    """Clear user state back to a fresh namespace."""
+    _namespace.clear()
+    _namespace["__builtins__"] = __builtins__
+    _namespace["RelayCapability"] = RelayCapability
+    _namespace["_relay"] = _relay
+    _history.clear()
+    _capabilities.clear()
+    _relay_capabilities.clear()
+    _dirty.clear()
+    _functions_cache.clear()
+    _variables_cache.clear()
+    _def_index.clear()
+    # Both identity-keyed caches hold strong references to user
+    # objects; a pooled child must not carry them across sessions.
+    _cached_source.cache_clear()
+    _cached_sig.cache_clear()
+    _last_exc[0] = None
+    return {"success": True}
+
+def _get_traceback() -> dict:
+    """Format the most recent execution failure's traceback."""
+    exc = _last_exc[0]
+    if exc is None:
+        return {"traceback": None}
+    return {"traceback": "".join(traceback.format_exception(exc))}
+
+def _execute(code: str) -> dict:
+    """Execute code and return result."""
+    stdout_capture = _stdout_capture
+    stderr_capture = _stderr_capture
+    stdout_capture.reset()
+    stderr_capture.reset()
+    result = {
+        "type": "execute_result",
+        "success": True,
+        "stdout": "",
+        "stderr": "",
+        "return_value": None,
+        "error_type": None,
+        "error_message": None,
+    }
+
+    try:
+        with redirect_stdout(stdout_capture), redirect_stderr(stderr_capture):
+            mode, compiled, defs = _compile_code(code)
+            if mode == "eval":
+                return_value = eval(compiled, _namespace)
+                # JSON-native roots skip the recursive _serialize walk.
+                if return_value is None or type(return_value) in (bool, int, float, str):
+                    result["return_value"] = return_value
+                else:
+                    result["return_value"] = _serialize(return_value)
+            else:
+                exec(compiled, _namespace)
+
+        _history.append(code)
+        for kind, def_name, segment in defs:
+            _def_index[(kind, def_name)] = code
+            # Tag the object with its own source so export reads it in
+            # O(1) instead of going through inspect.getsource.
+            obj = _namespace.get(def_name)
+            if obj is not None and segment is not None:
+                try:
+                    obj.__source__ = segment
+                except (AttributeError, TypeError):
+                    pass
+        _last_exc[0] = None
+
+    except Exception as e:
+        result["success"] = False
+        result["error_type"] = type(e).__name__
+        result["error_message"] = str(e)
+        # Keep the exception for on-demand formatting; most callers
+        # only read the type and message, so the full traceback is
+        # built lazily by the get_traceback request.
+        _last_exc[0] = e
+    finally:
+        result["stdout"] = stdout_capture.getvalue()
+        result["stderr"] = stderr_capture.getvalue()
+
+    return result
+
+# Classified bindings, updated incrementally from _dirty. In-place
+# mutation of an existing object does not rebind its name, so type
+# previews refresh on the next rebinding rather than every poll.
+_functions_cache = {}
+_variables_cache = {}
+
+def _refresh_state_caches():
+    """Reclassify names rebound (or snuck past tracking) since the last snapshot."""
+    # __setitem__ only sees top-level STORE_NAME; STORE_GLOBAL inside a
+    # function and bulk calls like dict.update go straight to the base
+    # dict. Reconcile against the live key set so names that appeared or
+    # vanished without tripping _dirty are still picked up.
+    current = {
+        name for name in _namespace
+        if not name.startswith("_") and name != "RelayCapability"
+    }
+    tracked = _functions_cache.keys() | _variables_cache.keys()
+    stale = _dirty | (current ^ tracked)
+    if not stale:
+        return
+    for name in stale:
+        _functions_cache.pop(name, None)
+        _variables_cache.pop(name, None)
+        if name.startswith("_") or name == "RelayCapability":
+            continue
+        if name not in _namespace:
+            continue
+        value = _namespace[name]
+
+        if callable(value) and not isinstance(value, type):
+            # It's a function
+            try:
+                sig = _cached_sig(value)
+            except (ValueError, TypeError):
+                sig = "(...)"
+            doc = (value.__doc__ or "").split("\n")[0]
+            _functions_cache[name] = {
+                "name": name,
+                "signature": sig,
+                "docstring": doc,
+            }
+        elif not callable(value):
+            # It's a variable
+            _variables_cache[name] = _get_type_str(value)
+    _dirty.clear()
+
+def _get_state() -> dict:
+    """Get current REPL state."""
+    _refresh_state_caches()
+
+    # Combine native and relay capabilities
+    all_caps = list(_capabilities.keys()) + list(_relay_capabilities.keys())
+
+    return {
+        "defined_functions": list(_functions_cache.values()),
+        "variables": dict(_variables_cache),
+        "capabilities": all_caps,
+        "history_length": len(_history),
+    }
+
+def _inject(name: str, code: str) -> dict:
+    """Inject code into namespace."""
+    try:
+        # Injected code may rebind names; drop cached signatures and
+        # sources so the caches do not pin replaced objects alive.
+        _cached_sig.cache_clear()
+        _cached_source.cache_clear()
+        exec(code, _namespace)
+        _namespace[name] = _namespace.get(name)
+        return {"success": True}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+def _inject_relay_capability(name: str, tools: dict) -> dict:
+    """Inject a relay capability into the namespace."""
+    try:
+        cap = RelayCapability(name, tools)
+        _namespace[name] = cap
+        _relay_capabilities[name] = cap
+        return {"success": True}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+def _register_capability(name: str) -> dict:
+    """Register a capability from the namespace."""
+    if name not in _namespace:
+        return {"success": False, "error": f"'{name}' not found in namespace"}
+    cap = _namespace[name]
+    if not hasattr(cap, "name") or not hasattr(cap, "describe"):
+        return {
+            "success": False,
+            "error": f"'{name}' is not a valid capability (needs name and describe)",
+        }
+    _capabilities[cap.name] = cap
+    return {"success": True, "capability_name": cap.name}
+
+def _list_capabilities() -> dict:
+    """List registered capabilities."""
+    caps = []
+    for name, cap in _capabilities.items():
+        caps.append({
+            "name": name,
+            "type": "native",
+            "description": getattr(cap, "description", ""),
+        })
+    for name, cap in _relay_capabilities.items():
+        caps.append({
+            "name": name,
+            "type": "relay",
+            "description": getattr(cap, "description", ""),
+        })
+    return {"capabilities": caps}
+
+# Top-level definitions indexed as code executes: (kind, name) -> source
+# block. Makes export lookups O(1) instead of a history rescan.
+_def_index = {}
+
+
+def _find_definition_in_history(name: str, is_class: bool = False) -> str:
+    """Find the definition of a function or class in history."""
+    keyword = "class" if is_class else "def"
+
+    indexed = _def_index.get((keyword, name))
+    if indexed is not None:
+        return indexed
+
+    # Fall back to scanning for history that bypassed the index
+    # (e.g. restored via import_state).
+    pattern = f"{keyword} {name}"
+
+    for code in reversed(_history):
+        if pattern in code:
+            # Found a potential definition
+            lines = code.strip().split("\n")
+            for i, line in enumerate(lines):
+                if line.strip().startswith(f"{keyword} {name}"):
+                    # Extract the full definition
+                    return code
+    return None
+
+def _export_state() -> dict:
+    """Export full REPL state for persistence."""
+    functions = []
+    variables = []
+
+    for name, value in _namespace.items():
+        if name.startswith("_"):
+            continue
+        if name == "RelayCapability":
+            continue
+        # Skip registered capabilities (handled separately)
+        if name in _capabilities or name in _relay_capabilities:
+            continue
+
+        if callable(value) and not isinstance(value, type):
+            # It's a function - try to get source
+            source = _cached_source(value)
+            if source is None:
+                # Can't get source via inspect, try history
+                source = _find_definition_in_history(name, is_class=False)
+
+            if source:
+                try:
+                    sig = _cached_sig(value)
+                except (ValueError, TypeError):
+                    sig = "(...)"
+                doc = (value.__doc__ or "").split("\n")[0]
+                functions.append({
+                    "name": name,
+                    "source": source,
+                    "signature": sig,
+                    "docstring": doc,
+                })
+        elif isinstance(value, type):
+            # It's a class - try to get source
+            source = _cached_source(value)
+            if source is None:
+                # Can't get source via inspect, try history
+                source = _find_definition_in_history(name, is_class=True)
+
+            if source:
+                functions.append({
+                    "name": name,
+                    "source": source,
+                    "signature": "",
+                    "docstring": (value.__doc__ or "").split("\n")[0],
+                })
+        else:
+            # It's a variable. Scalars skip the probe; containers get one
+            # C-path encode to classify instead of the old stdlib dumps.
+            var_entry = {"name": name}
+            if value is None or type(value) in (bool, int, float, str) or _probe_json(value):
+                var_entry["type"] = "json"
+                var_entry["value"] = value
+            else:
+                # Fall back to repr
+                var_entry["type"] = "repr"
+                var_entry["value"] = repr(value)
+            variables.append(var_entry)
+
+    # Export native capabilities (their class source)
+    native_caps = []
+    for name, cap in _capabilities.items():
+        cap_entry = {"name": name, "type": "native"}
+        cap_entry["source"] = _cached_source(type(cap))
+        native_caps.append(cap_entry)
+
+    # Export relay capabilities (their tool specs)
+    relay_caps = []
+    for name, cap in _relay_capabilities.items():
+        relay_caps.append({
+            "name": name,
+            "type": "relay",
+            "tools": cap._tools,
+        })
+
+    return {
+        "functions": functions,
+        "variables": variables,
+        "native_capabilities": native_caps,
+        "relay_capabilities": relay_caps,
+        "history": _history.copy(),
+    }
+
+def _export_state_stream(buf):
+    """Stream export records as individual frames.
+
+    Emits one {"type": "export_chunk", "kind": ..., "data": ...} frame
+    per function/variable/capability/history entry and a closing
+    {"type": "export_end"}, so multi-MB exports are never encoded as a
+    single frame and the consumer can process records as they arrive.
+    """
+    export = _export_state()
+    for kind, key in (
+        ("function", "functions"),
+        ("variable", "variables"),
+        ("native_capability", "native_capabilities"),
+        ("relay_capability", "relay_capabilities"),
+        ("history", "history"),
+    ):
+        for item in export[key]:
+            _write_msg(buf, {"type": "export_chunk", "kind": kind, "data": item})
+    _write_msg(buf, {"type": "export_end"})
+
+
+def _import_state(state: dict) -> dict:
+    """Import state from persistence."""
+    results = {
+        "functions_restored": 0,
+        "functions_failed": [],
+        "variables_restored": 0,
+        "variables_failed": [],
+        "capabilities_restored": 0,
+        "capabilities_failed": [],
+    }
+
+    # Restore functions first (they may be used by variables)
+    for func in state.get("functions", []):
+        name = func["name"]
+        source = func.get("source")
+        if source:
+            try:
+                exec(source, _namespace)
+                results["functions_restored"] += 1
+            except Exception as e:
+                results["functions_failed"].append({"name": name, "error": str(e)})
+
+    # Restore variables
+    for var in state.get("variables", []):
+        name = var["name"]
+        var_type = var.get("type", "json")
+        value = var.get("value")
+        if var_type == "json":
+            try:
+                _namespace[name] = value
+                results["variables_restored"] += 1
+            except Exception as e:
+                results["variables_failed"].append({"name": name, "error": str(e)})
+        else:
+            # repr type - can't restore
+            results["variables_failed"].append({"name": name, "error": "repr-only value"})
+
+    # Restore native capabilities
+    for cap in state.get("native_capabilities", []):
+        name = cap["name"]
+        source = cap.get("source")
+        if source:
+            try:
+                exec(source, _namespace)
+                # Find the class and instantiate it
+                # The source should define a class, we need to find it
+                for n, v in list(_namespace.items()):
+                    if isinstance(v, type) and hasattr(v, "name") and hasattr(v, "describe"):
+                        # Instantiate and register
+                        instance = v()
+                        _namespace[instance.name] = instance
+                        _capabilities[instance.name] = instance
+                        results["capabilities_restored"] += 1
+                        break
+            except Exception as e:
+                results["capabilities_failed"].append({"name": name, "error": str(e)})
+
+    # Note: relay capabilities are restored by the harness reconnecting to MCP servers
+    # We just record what needs to be restored
+    results["relay_capabilities_to_restore"] = [
+        c["name"] for c in state.get("relay_capabilities", [])
+    ]
+
+    # Restore history
+    _history.clear()
+    _history.extend(state.get("history", []))
+
+    # Rebuild the definition index in one pass over the restored history
+    # so later exports resolve names by lookup instead of rescanning.
+    _def_index.clear()
+    for block in _history:
+        try:
+            tree = ast.parse(block)
+        except SyntaxError:
+            continue
+        for node in tree.body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                kind = "class" if isinstance(node, ast.ClassDef) else "def"
+                _def_index[(kind, node.name)] = block
+
+    return results
+
+def _dispatch(request: dict):
+    """Route one request to its handler."""
+    req_type = request.get("type")
+
+    if req_type == "execute":
+        return _execute(request["code"])
+    elif req_type == "state":
+        return _get_state()
+    elif req_type == "inject":
+        return _inject(request["name"], request["code"])
+    elif req_type == "inject_relay_capability":
+        return _inject_relay_capability(request["name"], request["tools"])
+    elif req_type == "register_capability":
+        return _register_capability(request["name"])
+    elif req_type == "list_capabilities":
+        return _list_capabilities()
+    elif req_type == "export_state":
+        return _export_state()
+    elif req_type == "snapshot":
+        return _snapshot()
+    elif req_type == "import_state":
+        return _import_state(request["state"])
+    elif req_type == "batch":
+        return [_dispatch(r) for r in request["requests"]]
+    elif req_type == "reset":
+        return _reset()
+    elif req_type == "get_traceback":
+        return _get_traceback()
+    elif req_type == "ping":
+        return {"pong": True}
+    else:
+        return {"error": f"Unknown request type: {req_type}"}
+
+
+def _main():
+    # IPC loop - length-prefixed JSON messages over stdin/stdout
+    while True:
+        try:
+            request = _read_msg(sys.stdin.buffer)
+            if request is None:
+                break
+
+            if request.get("type") == "export_state_stream":
+                # Streaming op writes its own frames.
+                _export_state_stream(sys.stdout.buffer)
+                continue
+
+            response = _dispatch(request)
+            if isinstance(response, dict) and response.get("type") == "execute_result":
+                _write_execute_result(sys.stdout.buffer, response)
+            else:
+                _write_msg(sys.stdout.buffer, response)
+
+        except ValueError as e:
+            _write_msg(sys.stdout.buffer, {"error": f"Invalid JSON: {e}"})
+        except Exception as e:
+            _write_msg(sys.stdout.buffer, {"error": f"Internal error: {e}"})
+
+
+if __name__ == "__main__":
+    _main()
@@ -9,8 +9,9 @@ import json
 import socket
 import sys
 from pathlib import Path
-from typing import Any, TextIO
+from typing import Any, BinaryIO
 
+from agentself.harness.jsonio import dumps_bytes, loads
 from agentself.paths import ATTACH_HISTORY_PATH, ATTACH_SOCKET_PATH
 try:
     import readline
@@ -27,6 +28,65 @@ except Exception:  # pragma: no cover - optional dependency
     KeyBindings = None
 
 
+# Cache of completeness checks so Enter keypresses don't re-parse the buffer.
+_compile_cache: dict[int, bool] = {}
+_COMPILE_CACHE_MAX = 128
+
+
+def _input_complete(text: str) -> bool:
+    """Return True if ``text`` parses as a complete block of Python code."""
+    key = hash(text)
+    cached = _compile_cache.get(key)
+    if cached is not None:
+        return cached
+    try:
+        result = codeop.compile_command(text, symbol="exec") is not None
+    except (SyntaxError, ValueError, OverflowError):
+        result = True
+    if len(_compile_cache) >= _COMPILE_CACHE_MAX:
+        _compile_cache.clear()
+    _compile_cache[key] = result
+    return result
+
+
+# Key bindings are stateless; build them once per process and share across sessions.
+_key_bindings = None
+
+
+def _get_key_bindings():
+    """Build the prompt_toolkit key bindings once and reuse them."""
+    global _key_bindings
+    if _key_bindings is not None:
+        return _key_bindings
+
+    key_bindings = KeyBindings()
+
+    @key_bindings.add("enter")
+    def _(event) -> None:
+        buffer = event.current_buffer
+        if buffer.cursor_position != len(buffer.text):
+            buffer.insert_text("\n")
+        elif _input_complete(buffer.text):
+            buffer.validate_and_handle()
+        else:
+            buffer.insert_text("\n")
+
+    @key_bindings.add("escape", "enter")
+    def _(event) -> None:
+        event.current_buffer.insert_text("\n")
+
+    @key_bindings.add("escape", "left")
+    def _(event) -> None:
+        event.current_buffer.cursor_backward_word(count=1)
+
+    @key_bindings.add("escape", "right")
+    def _(event) -> None:
+        event.current_buffer.cursor_forward_word(count=1)
+
+    _key_bindings = key_bindings
+    return key_bindings
+
+
 def _default_socket() -> Path:
     return ATTACH_SOCKET_PATH
 
@@ -35,13 +95,13 @@ def _history_path() -> Path:
     return ATTACH_HISTORY_PATH
 
 
-def _send_request(sock_file: TextIO, request: dict[str, Any]) -> dict[str, Any]:
-    sock_file.write(json.dumps(request) + "\n")
+def _send_request(sock_file: BinaryIO, request: dict[str, Any]) -> dict[str, Any]:
+    sock_file.write(dumps_bytes(request) + b"\n")
     sock_file.flush()
     response_line = sock_file.readline()
     if not response_line:
         raise RuntimeError("Attach server closed connection")
-    return json.loads(response_line)
+    return loads(response_line)
 
 
 def _print_result(result: dict[str, Any]) -> None:
@@ -59,7 +119,22 @@ def _print_result(result: dict[str, Any]) -> None:
     print(json.dumps(result, indent=2))
 
 
-def _handle_line(sock_file: TextIO, wait: bool, line: str) -> bool:
+def _read_block() -> str:
+    """Read lines for a :block until the :end sentinel and join them once."""
+    if not sys.stdin.isatty():
+        # Piped or pasted input: read line by line without prompting, and
+        # stop at the sentinel so commands after :end stay in the stream
+        # for the main loop.
+        lines = []
+        for line in iter(sys.stdin.readline, ""):
+            if line.strip() == ":end":
+                break
+            lines.append(line.rstrip("\n"))
+        return "\n".join(lines)
+    return "\n".join(iter(lambda: input("... "), ":end"))
+
+
+def _handle_line(sock_file: BinaryIO, wait: bool, line: str) -> bool:
     stripped = line.strip()
 
     if not stripped:
@@ -85,13 +160,7 @@ def _handle_line(sock_file: TextIO, wait: bool, line: str) -> bool:
         return True
     if stripped == ":block":
         print("Enter code, finish with :end")
-        lines = []
-        while True:
-            block_line = input("... ")
-            if block_line.strip() == ":end":
-                break
-            lines.append(block_line)
-        code = "\n".join(lines)
+        code = _read_block()
         result = _send_request(sock_file, {"op": "execute", "code": code, "wait": wait})
         _print_result(result)
         return True
@@ -128,7 +197,7 @@ def _configure_readline(history_path: Path) -> None:
     atexit.register(_save_history)
 
 
-def _interactive_readline(sock_file: TextIO, wait: bool) -> None:
+def _interactive_readline(sock_file: BinaryIO, wait: bool) -> None:
     _configure_readline(_history_path())
     print("Attached. Commands: :state, :caps, :desc <name>, :block, :quit")
     while True:
@@ -142,43 +211,13 @@ def _interactive_readline(sock_file: TextIO, wait: bool) -> None:
             break
 
 
-def _interactive_prompt_toolkit(sock_file: TextIO, wait: bool) -> None:
+def _interactive_prompt_toolkit(sock_file: BinaryIO, wait: bool) -> None:
     history_path = _history_path()
     history_path.parent.mkdir(parents=True, exist_ok=True)
-    key_bindings = KeyBindings()
-
-    def _input_complete(text: str) -> bool:
-        try:
-            return codeop.compile_command(text, symbol="exec") is not None
-        except (SyntaxError, ValueError, OverflowError):
-            return True
-
-    @key_bindings.add("enter")
-    def _(event) -> None:
-        buffer = event.current_buffer
-        if buffer.cursor_position != len(buffer.text):
-            buffer.insert_text("\n")
-        elif _input_complete(buffer.text):
-            buffer.validate_and_handle()
-        else:
-            buffer.insert_text("\n")
-
-    @key_bindings.add("escape", "enter")
-    def _(event) -> None:
-        event.current_buffer.insert_text("\n")
-
-    @key_bindings.add("escape", "left")
-    def _(event) -> None:
-        event.current_buffer.cursor_backward_word(count=1)
-
-    @key_bindings.add("escape", "right")
-    def _(event) -> None:
-        event.current_buffer.cursor_forward_word(count=1)
-
     session = PromptSession(
         "repl> ",
         multiline=True,
-        key_bindings=key_bindings,
+        key_bindings=_get_key_bindings(),
         history=FileHistory(str(history_path)),
     )
 
@@ -210,7 +249,9 @@ def main() -> None:
 
     with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
         sock.connect(str(socket_path))
-        sock_file = sock.makefile("rw", encoding="utf-8")
+        # Binary mode: decode once per response line instead of through a
+        # TextIO incremental-decoder wrapper (json.loads accepts bytes).
+        sock_file = sock.makefile("rwb")
 
         if args.exec_code:
             code = args.exec_code
@@ -2,30 +2,47 @@
 
 from __future__ import annotations
 
-import json
 import logging
+import socket
 import socketserver
 import time
-from dataclasses import asdict
 from pathlib import Path
 from typing import Any
 
+from agentself.harness.jsonio import dumps_bytes, loads
 from agentself.harness.logging_utils import abbreviate
 from agentself.harness.runtime import HarnessRuntime
 
 logger = logging.getLogger(__name__)
 
+# Hot responses pre-built once: the dicts are shared (never mutated by
+# callers) and their encoded payloads skip json encoding entirely.
+_PING_IDLE = {"success": True, "busy": False}
+_PING_BUSY = {"success": True, "busy": True}
+_BUSY_ERROR = {"success": False, "error": "REPL busy"}
+_PRE_ENCODED = {
+    id(response): dumps_bytes(response) + b"\n"
+    for response in (_PING_IDLE, _PING_BUSY, _BUSY_ERROR)
+}
+
 
 class AttachRequestHandler(socketserver.StreamRequestHandler):
     """Handle attach client requests."""
 
+    def setup(self) -> None:
+        super().setup()
+        if self.connection.family == socket.AF_INET:
+            # Interactive request/response traffic; don't let Nagle delay
+            # small frames.
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
     def handle(self) -> None:
         for line in self.rfile:
             if not line:
                 break
             try:
-                request = json.loads(line.decode("utf-8").strip())
-            except json.JSONDecodeError as exc:
+                request = loads(line)
+            except ValueError as exc:
                 logger.warning("invalid json error=%s", exc)
                 response = {"success": False, "error": f"Invalid JSON: {exc}"}
                 self._send_response(response)
@@ -33,13 +50,14 @@ class AttachRequestHandler(socketserver.StreamRequestHandler):
 
             op = request.get("op")
             wait = request.get("wait", False)
-            detail = ""
-            if op == "execute":
-                detail = f" code={abbreviate(request.get('code', ''))}"
-            elif op == "describe_capability":
-                detail = f" name={request.get('name', '')}"
-
-            logger.debug("request op=%s wait=%s%s", op, wait, detail)
+            # Only build the preview string when debug logging is on.
+            if logger.isEnabledFor(logging.DEBUG):
+                detail = ""
+                if op == "execute":
+                    detail = f" code={abbreviate(request.get('code', ''))}"
+                elif op == "describe_capability":
+                    detail = f" name={request.get('name', '')}"
+                logger.debug("request op=%s wait=%s%s", op, wait, detail)
             start = time.perf_counter()
             try:
                 response = self.server.dispatch(request)  # type: ignore[attr-defined]
@@ -47,21 +65,27 @@ class AttachRequestHandler(socketserver.StreamRequestHandler):
                 logger.exception("dispatch failed op=%s", op)
                 response = {"success": False, "error": "Dispatch failed"}
             duration_ms = int((time.perf_counter() - start) * 1000)
-            if response.get("success", True):
-                logger.debug("response op=%s success=True duration_ms=%s", op, duration_ms)
-            else:
-                logger.debug(
-                    "response op=%s success=False duration_ms=%s error=%s",
-                    op,
-                    duration_ms,
-                    abbreviate(str(response.get("error", ""))),
-                )
+            if logger.isEnabledFor(logging.DEBUG):
+                if response.get("success", True):
+                    logger.debug(
+                        "response op=%s success=True duration_ms=%s", op, duration_ms
+                    )
+                else:
+                    logger.debug(
+                        "response op=%s success=False duration_ms=%s error=%s",
+                        op,
+                        duration_ms,
+                        abbreviate(str(response.get("error", ""))),
+                    )
             self._send_response(response)
 
     def _send_response(self, response: dict[str, Any]) -> None:
-        payload = json.dumps(response).encode("utf-8") + b"\n"
-        self.wfile.write(payload)
-        self.wfile.flush()
+        payload = _PRE_ENCODED.get(id(response))
+        if payload is None:
+            payload = dumps_bytes(response) + b"\n"
+        # One pre-framed buffer straight to the socket; skips the wfile
+        # wrapper and its no-op flush.
+        self.connection.sendall(payload)
 
 
 class AttachServerBase:
@@ -69,6 +93,8 @@ class AttachServerBase:
 
     def __init__(self, runtime: HarnessRuntime):
         self.runtime = runtime
+        # (caps_version, capabilities) pair; rebuilt when the version moves.
+        self._caps_cache: tuple[int, list[dict[str, Any]]] | None = None
 
     def dispatch(self, request: dict[str, Any]) -> dict[str, Any]:
         op = request.get("op")
@@ -76,49 +102,79 @@ class AttachServerBase:
         timeout = request.get("timeout")
 
         if op == "ping":
-            return {"success": True, "busy": self.runtime.busy()}
-
-        if op in {
-            "execute",
-            "state",
-            "list_capabilities",
-            "describe_capability",
-            "export_state",
-            "import_state",
-        }:
-            if not self.runtime.acquire(wait=wait, timeout=timeout):
-                logger.debug("reject op=%s reason=busy wait=%s timeout=%s", op, wait, timeout)
-                return {"success": False, "error": "REPL busy"}
-            try:
-                return self._dispatch_locked(op, request)
-            finally:
-                self.runtime.release()
-
-        return {"success": False, "error": f"Unknown op: {op}"}
-
-    def _dispatch_locked(self, op: str, request: dict[str, Any]) -> dict[str, Any]:
-        if op == "execute":
-            code = request.get("code", "")
-            result = self.runtime.repl.execute(code)
-            return asdict(result)
-        if op == "state":
-            result = self.runtime.repl.state()
-            return asdict(result)
-        if op == "list_capabilities":
-            return {"success": True, "capabilities": self.runtime.repl.list_capabilities()}
-        if op == "describe_capability":
-            name = request.get("name", "")
-            result = self.runtime.repl.execute(f"{name}.describe()")
-            if result.success:
-                return {"success": True, "description": result.return_value}
-            return {"success": False, "error": f"Capability '{name}' not found or has no describe()"}
-        if op == "export_state":
-            return {"success": True, "state": self.runtime.repl.export_state()}
-        if op == "import_state":
-            state = request.get("state", {})
-            return {"success": True, "result": self.runtime.repl.import_state(state)}
-        return {"success": False, "error": f"Unhandled op: {op}"}
-
+            return _PING_BUSY if self.runtime.busy() else _PING_IDLE
+
+        handler = self._LOCKED_OPS.get(op)
+        if handler is None:
+            return {"success": False, "error": f"Unknown op: {op}"}
+
+        if not self.runtime.acquire(wait=wait, timeout=timeout):
+            logger.debug("reject op=%s reason=busy wait=%s timeout=%s", op, wait, timeout)
+            return _BUSY_ERROR
+        try:
+            return handler(self, request)
+        finally:
+            self.runtime.release()
+
+    def _op_execute(self, request: dict[str, Any]) -> dict[str, Any]:
+        code = request.get("code", "")
+        result = self.runtime.repl.execute(code)
+        return result.to_dict()
+
+    def _op_state(self, request: dict[str, Any]) -> dict[str, Any]:
+        result = self.runtime.repl.state()
+        return result.to_dict()
+
+    def _op_get_traceback(self, request: dict[str, Any]) -> dict[str, Any]:
+        return {"success": True, "traceback": self.runtime.repl.get_traceback()}
+
+    def _op_list_capabilities(self, request: dict[str, Any]) -> dict[str, Any]:
+        version = self.runtime.caps_version
+        cached = self._caps_cache
+        if cached is None or cached[0] != version:
+            cached = (version, self.runtime.repl.list_capabilities())
+            self._caps_cache = cached
+        return {"success": True, "capabilities": cached[1]}
+
+    def _op_describe_capability(self, request: dict[str, Any]) -> dict[str, Any]:
+        name = request.get("name", "")
+        # Guard before interpolating into an execute string: anything
+        # that is not a plain identifier would otherwise run as code.
+        if not name.isidentifier():
+            return {"success": False, "error": f"Invalid capability name: {name!r}"}
+
+        cached = self.runtime.descriptions.get(name)
+        if cached is not None:
+            return {"success": True, "description": cached}
+
+        result = self.runtime.repl.execute(f"{name}.describe()")
+        if result.success:
+            if isinstance(result.return_value, str):
+                self.runtime.descriptions[name] = result.return_value
+            return {"success": True, "description": result.return_value}
+        return {"success": False, "error": f"Capability '{name}' not found or has no describe()"}
+
+    def _op_export_state(self, request: dict[str, Any]) -> dict[str, Any]:
+        return {"success": True, "state": self.runtime.repl.export_state()}
+
+    def _op_import_state(self, request: dict[str, Any]) -> dict[str, Any]:
+        state = request.get("state", {})
+        result = self.runtime.repl.import_state(state)
+        # Imported state can register native capabilities; move the caps
+        # version so the version-keyed capability caches refetch.
+        self.runtime.bump_caps_version()
+        return {"success": True, "result": result}
+
+    # Ops that require holding the runtime lock, resolved in one dict lookup.
+    _LOCKED_OPS = {
+        "execute": _op_execute,
+        "state": _op_state,
+        "get_traceback": _op_get_traceback,
+        "list_capabilities": _op_list_capabilities,
+        "describe_capability": _op_describe_capability,
+        "export_state": _op_export_state,
+        "import_state": _op_import_state,
+    }
 
 class AttachServer(AttachServerBase, socketserver.ThreadingUnixStreamServer):
     """Unix socket server that proxies requests to the shared REPL."""
@@ -128,8 +184,7 @@ class AttachServer(AttachServerBase, socketserver.ThreadingUnixStreamServer):
 
     def __init__(self, socket_path: Path, runtime: HarnessRuntime):
         self.socket_path = socket_path
-        if self.socket_path.exists():
-            self.socket_path.unlink()
+        self.socket_path.unlink(missing_ok=True)
         AttachServerBase.__init__(self, runtime)
         socketserver.ThreadingUnixStreamServer.__init__(
             self,
@@ -139,16 +194,27 @@ class AttachServer(AttachServerBase, socketserver.ThreadingUnixStreamServer):
 
     def server_close(self) -> None:
         super().server_close()
-        if self.socket_path.exists():
-            self.socket_path.unlink()
+        self.socket_path.unlink(missing_ok=True)
 
 
 class AttachTCPServer(AttachServerBase, socketserver.ThreadingTCPServer):
-    """TCP server that proxies requests to the shared REPL."""
+    """TCP server that proxies requests to the shared REPL.
+
+    For same-host attaches prefer AttachServer (AF_UNIX): it avoids the
+    TCP loopback stack entirely and has lower per-request latency.
+    """
 
     allow_reuse_address = True
     daemon_threads = True
 
+    # Socket buffer size for large state/export payloads.
+    socket_buffer_size = 1 << 20
+
+    def server_bind(self) -> None:
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.socket_buffer_size)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.socket_buffer_size)
+        super().server_bind()
+
     def __init__(self, host: str, port: int, runtime: HarnessRuntime):
         AttachServerBase.__init__(self, runtime)
         socketserver.ThreadingTCPServer.__init__(
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import functools
 import textwrap
 from pathlib import Path
 from typing import Iterable
@@ -12,6 +13,32 @@ from agentself.harness.runtime import HarnessRuntime
 DEFAULT_SAFE_COMMANDS = ["ls", "cat", "pwd"]
 
 
+@functools.cache
+def _resolve_root(path: str) -> Path:
+    """Expand and resolve a sandbox root once per distinct path."""
+    return Path(path).expanduser().resolve()
+
+
+# Capabilities must be constructed inside the REPL subprocess, so bootstrap
+# still ships source over the wire; the template is dedented once at import
+# instead of per bootstrap.
+SAFE_BOOTSTRAP_TEMPLATE = textwrap.dedent(
+    """
+    from agentself.capabilities import FileSystemCapability, CommandLineCapability
+    from agentself.capabilities.skills import SkillsCapability
+
+    fs = FileSystemCapability(allowed_paths=[{root}], read_only=True)
+    cmd = CommandLineCapability(
+        allowed_commands={commands},
+        allowed_cwd=[{root}],
+        allowed_paths=[{root}],
+        deny_shell_operators=True,
+    )
+    skills = SkillsCapability()
+    """
+).strip()
+
+
 def seed_sandbox(root: Path) -> None:
     """Create a few files to make the sandbox immediately usable."""
     root.mkdir(parents=True, exist_ok=True)
@@ -31,34 +58,21 @@ def bootstrap_safe(
     seed: bool = True,
 ) -> None:
     """Install locked-down FS + shell capabilities into the REPL."""
-    root = root.expanduser().resolve()
+    root = _resolve_root(str(root))
     if seed:
         seed_sandbox(root)
 
     allowed_commands = list(allowed_commands or DEFAULT_SAFE_COMMANDS)
-    root_literal = repr(str(root))
-    commands_literal = repr(allowed_commands)
-
-    code = textwrap.dedent(
-        f"""
-        from agentself.capabilities import FileSystemCapability, CommandLineCapability
-        from agentself.capabilities.skills import SkillsCapability
-
-        fs = FileSystemCapability(allowed_paths=[{root_literal}], read_only=True)
-        cmd = CommandLineCapability(
-            allowed_commands={commands_literal},
-            allowed_cwd=[{root_literal}],
-            allowed_paths=[{root_literal}],
-            deny_shell_operators=True,
-        )
-        skills = SkillsCapability()
-        """
-    ).strip()
-
-    runtime.acquire()
-    try:
-        runtime.repl.execute(code)
-        runtime.repl.register_capability("fs")
-        runtime.repl.register_capability("cmd")
-    finally:
-        runtime.release()
+    code = SAFE_BOOTSTRAP_TEMPLATE.format(
+        root=repr(str(root)),
+        commands=repr(allowed_commands),
+    )
+
+    with runtime.locked():
+        # One roundtrip for the construct + register sequence.
+        runtime.repl.batch([
+            {"type": "execute", "code": code},
+            {"type": "register_capability", "name": "fs"},
+            {"type": "register_capability", "name": "cmd"},
+        ])
+        runtime.bump_caps_version()
@@ -7,6 +7,7 @@ and making tool calls on behalf of the REPL.
 from __future__ import annotations
 
 import asyncio
+import functools
 import logging
 import shlex
 from dataclasses import dataclass, field
@@ -17,6 +18,12 @@ from mcp.client.stdio import stdio_client
 
 logger = logging.getLogger(__name__)
 
+
+@functools.lru_cache(maxsize=256)
+def _split_command(command: str) -> tuple[str, ...]:
+    """Tokenize a command line, cached so repeat installs skip shlex."""
+    return tuple(shlex.split(command))
+
 @dataclass
 class ToolSpec:
     """Specification for an MCP tool."""
@@ -77,64 +84,75 @@ class MCPHub:
             RuntimeError: If connection fails.
         """
         async with self._lock:
-            if name in self.backends:
-                await self.uninstall(name)
-
-            # Parse command
-            command_line = command
-            if args is None:
-                parts = shlex.split(command)
-                if not parts:
-                    raise ValueError(f"Invalid command: {command}")
-                command = parts[0]
-                args = parts[1:] if len(parts) > 1 else []
-            else:
-                command_line = " ".join([command] + args)
-
-            server_params = StdioServerParameters(
-                command=command,
-                args=args,
-                env=env,
-                cwd=cwd,
+            existing = self.backends.pop(name, None)
+        if existing is not None:
+            await self._close_backend(existing)
+
+        # Parse command; structured callers (mcp_config, restore) pass
+        # args directly and skip the tokenizer.
+        command_line = command
+        if args is None:
+            parts = _split_command(command)
+            if not parts:
+                raise ValueError(f"Invalid command: {command}")
+            command = parts[0]
+            args = list(parts[1:])
+        else:
+            command_line = " ".join([command] + args)
+
+        server_params = StdioServerParameters(
+            command=command,
+            args=args,
+            env=env,
+            cwd=cwd,
+        )
+
+        try:
+            logger.info(
+                "mcp install name=%s command=%s args=%s cwd=%s",
+                name,
+                command,
+                args,
+                cwd,
+            )
+            # Connect to the server. The lock is not held here so several
+            # installs can overlap their spawn + handshake.
+            read, write = await asyncio.wait_for(
+                stdio_client(server_params).__aenter__(),
+                timeout=30.0,
             )
+            session = ClientSession(read, write)
+            await session.__aenter__()
+            await session.initialize()
+
+            # Get available tools
+            tools_result = await session.list_tools()
+            tools = {
+                t.name: ToolSpec.from_mcp(t) for t in tools_result.tools
+            }
 
-            try:
-                logger.info(
-                    "mcp install name=%s command=%s args=%s cwd=%s",
-                    name,
-                    command,
-                    args,
-                    cwd,
-                )
-                # Connect to the server
-                read, write = await asyncio.wait_for(
-                    stdio_client(server_params).__aenter__(),
-                    timeout=30.0,
-                )
-                session = ClientSession(read, write)
-                await session.__aenter__()
-                await session.initialize()
-
-                # Get available tools
-                tools_result = await session.list_tools()
-                tools = {
-                    t.name: ToolSpec.from_mcp(t) for t in tools_result.tools
-                }
-
-                self.backends[name] = BackendServer(
-                    name=name,
-                    command=command_line,
-                    tools=tools,
-                    session=session,
-                )
-
-                logger.info("mcp installed name=%s tools=%s", name, list(tools.keys()))
-                return list(tools.values())
-
-            except asyncio.TimeoutError:
-                raise RuntimeError(f"Timeout connecting to MCP server: {command}")
-            except Exception as e:
-                raise RuntimeError(f"Failed to connect to MCP server: {e}")
+            backend = BackendServer(
+                name=name,
+                command=command_line,
+                tools=tools,
+                session=session,
+            )
+            # Concurrent installs of the same name can both get here;
+            # pop any entry that appeared while this connect ran and
+            # close it rather than leaking its subprocess and session.
+            async with self._lock:
+                displaced = self.backends.pop(name, None)
+                self.backends[name] = backend
+            if displaced is not None:
+                await self._close_backend(displaced)
+
+            logger.info("mcp installed name=%s tools=%s", name, list(tools.keys()))
+            return list(tools.values())
+
+        except asyncio.TimeoutError:
+            raise RuntimeError(f"Timeout connecting to MCP server: {command}")
+        except Exception as e:
+            raise RuntimeError(f"Failed to connect to MCP server: {e}")
 
     async def call(self, capability: str, method: str, kwargs: dict) -> Any:
         """Call a tool on a backend server.
@@ -166,13 +184,16 @@ class MCPHub:
         try:
             logger.debug("mcp call capability=%s method=%s kwargs=%s", capability, method, kwargs)
             result = await backend.session.call_tool(method, kwargs)
-            # Extract content from result
-            if hasattr(result, "content") and result.content:
+            # Extract content from result; getattr with a default avoids
+            # hasattr's exception-based probe per item.
+            content = getattr(result, "content", None)
+            if content:
                 # Return first text content
-                for item in result.content:
-                    if hasattr(item, "text"):
-                        return item.text
-                return str(result.content)
+                for item in content:
+                    text = getattr(item, "text", None)
+                    if text is not None:
+                        return text
+                return str(content)
             return result
         except Exception as e:
             logger.exception("mcp call failed capability=%s method=%s", capability, method)
@@ -188,17 +209,19 @@ class MCPHub:
             True if disconnected, False if not found.
         """
         async with self._lock:
-            if name not in self.backends:
-                return False
-
-            backend = self.backends.pop(name)
-            try:
-                logger.info("mcp uninstall name=%s", name)
-                await backend.session.__aexit__(None, None, None)
-            except Exception:
-                pass  # Best effort cleanup
-
-            return True
+            backend = self.backends.pop(name, None)
+        if backend is None:
+            return False
+        await self._close_backend(backend)
+        return True
+
+    async def _close_backend(self, backend: BackendServer) -> None:
+        """Close a backend session, best effort."""
+        try:
+            logger.info("mcp uninstall name=%s", backend.name)
+            await backend.session.__aexit__(None, None, None)
+        except Exception:
+            pass  # Best effort cleanup
 
     def list_backends(self) -> list[dict[str, Any]]:
         """List all connected backends.
@@ -0,0 +1,31 @@
+"""JSON encode/decode helpers for harness IPC paths.
+
+Uses orjson (a fast C implementation) when it is installed and falls
+back to the stdlib json module otherwise. All helpers work in bytes so
+callers can write straight to sockets and pipes without a second
+encode step.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:  # pragma: no cover - optional dependency
+    import orjson
+except ImportError:
+    orjson = None
+
+
+if orjson is not None:
+    def dumps_bytes(obj: Any) -> bytes:
+        """Encode ``obj`` as UTF-8 JSON bytes."""
+        return orjson.dumps(obj)
+
+    loads = orjson.loads
+else:
+    def dumps_bytes(obj: Any) -> bytes:
+        """Encode ``obj`` as UTF-8 JSON bytes."""
+        return json.dumps(obj).encode("utf-8")
+
+    loads = json.loads
@@ -41,11 +41,19 @@ def configure_logging(log_level: str | None = None, log_file: str | None = None)
     logger.handlers = handlers
 
 
+_NL_TRANS = str.maketrans({"\n": "\\n"})
+
+
 def abbreviate(text: str, limit: int = 200) -> str:
     """Return a single-line, truncated preview string."""
-    if text is None:
+    if not text:
         return ""
-    flattened = text.replace("\n", "\\n")
+    if "\n" not in text:
+        # Common case: short single-line text needs no rewriting.
+        if len(text) <= limit:
+            return text
+        return f"{text[:limit]}..."
+    flattened = text.translate(_NL_TRANS)
     if len(flattened) <= limit:
         return flattened
     return f"{flattened[:limit]}..."
@@ -2,13 +2,14 @@
 
 from __future__ import annotations
 
-import json
+import asyncio
 import logging
 import os
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
+from agentself.harness.jsonio import loads
 from agentself.harness.runtime import HarnessRuntime
 
 logger = logging.getLogger(__name__)
@@ -35,10 +36,12 @@ def _expand_env(value: str) -> str:
 
 def _load_json(path: Path) -> dict[str, Any]:
     try:
-        return json.loads(path.read_text(encoding="utf-8"))
+        data = path.read_bytes()
     except FileNotFoundError:
         return {}
-    except json.JSONDecodeError as exc:
+    try:
+        return loads(data)
+    except ValueError as exc:
         logger.warning("Invalid mcp config json path=%s error=%s", path, exc)
         return {}
 
@@ -88,41 +91,78 @@ def _parse_servers(payload: dict[str, Any]) -> list[MCPServerConfig]:
     return servers
 
 
+# Parsed configs keyed by path; entries carry the file stat they were
+# parsed from so unchanged files skip the read + JSON parse.
+_config_cache: dict[str, tuple[int, int, list[MCPServerConfig]]] = {}
+
+
 def load_mcp_config(path: Path) -> list[MCPServerConfig]:
-    """Load MCP server configs from mcp.json."""
-    payload = _load_json(path)
-    return _parse_servers(payload)
+    """Load MCP server configs from mcp.json.
 
+    Results are cached by (mtime_ns, size), so repeated loads of an
+    unchanged file return the previously parsed configs.
+    """
+    try:
+        st = path.stat()
+    except OSError:
+        return []
+
+    key = str(path)
+    cached = _config_cache.get(key)
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
 
-async def install_from_config(runtime: HarnessRuntime, path: Path) -> list[str]:
-    """Install MCP servers defined in the config file."""
+    servers = _parse_servers(_load_json(path))
+    _config_cache[key] = (st.st_mtime_ns, st.st_size, servers)
+    return servers
+
+
+async def install_from_config(
+    runtime: HarnessRuntime,
+    path: Path,
+    max_concurrency: int = 4,
+) -> list[str]:
+    """Install MCP servers defined in the config file.
+
+    Server connects (subprocess spawn + handshake) overlap, bounded by
+    max_concurrency; REPL injection stays serialized on the event loop.
+    """
     servers = load_mcp_config(path)
     if not servers:
         return []
 
-    installed: list[str] = []
-    for server in servers:
-        if server.disabled:
-            continue
-        if server.transport and server.transport != "stdio":
-            logger.warning("Skipping MCP server %s: transport=%s", server.name, server.transport)
-            continue
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _install_one(server: MCPServerConfig) -> str | None:
         try:
-            tools = await runtime.hub.install(
-                server.name,
-                server.command,
-                args=server.args,
-                env=server.env,
-                cwd=server.cwd,
-            )
+            async with semaphore:
+                tools = await runtime.hub.install(
+                    server.name,
+                    server.command,
+                    args=server.args,
+                    env=server.env,
+                    cwd=server.cwd,
+                )
             tool_specs = {
                 t.name: {"description": t.description, "parameters": t.parameters}
                 for t in tools
             }
             runtime.repl.inject_relay_capability(server.name, tool_specs)
-            installed.append(server.name)
+            runtime.bump_caps_version()
             logger.info("installed mcp server name=%s command=%s", server.name, server.command_line)
+            return server.name
         except Exception as exc:
             logger.warning("failed to install mcp server name=%s error=%s", server.name, exc)
+            return None
+
+    eligible: list[MCPServerConfig] = []
+    for server in servers:
+        if server.disabled:
+            continue
+        if server.transport and server.transport != "stdio":
+            logger.warning("Skipping MCP server %s: transport=%s", server.name, server.transport)
+            continue
+        eligible.append(server)
 
-    return installed
+    results = await asyncio.gather(*(_install_one(server) for server in eligible))
+    return [name for name in results if name is not None]
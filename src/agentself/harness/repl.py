@@ -6,27 +6,24 @@ Supports relay calls to external MCP servers during code execution.
 
 from __future__ import annotations
 
-import json
+import asyncio
+import importlib.util
+import py_compile
+import struct
 import subprocess
 import sys
-import textwrap
+import threading
 from dataclasses import dataclass, field
+from pathlib import Path
 from typing import Any, Callable
 
+from agentself.core import ExecutionResult
+from agentself.harness.jsonio import dumps_bytes, loads
 
-@dataclass
-class ExecutionResult:
-    """Result of executing code in the REPL."""
+__all__ = ["AsyncREPLSubprocess", "ExecutionResult", "REPLPool", "REPLState", "REPLSubprocess"]
 
-    success: bool
-    stdout: str = ""
-    stderr: str = ""
-    return_value: Any = None
-    error_type: str | None = None
-    error_message: str | None = None
 
-
-@dataclass
+@dataclass(slots=True)
 class REPLState:
     """Current state of the REPL."""
 
@@ -35,500 +32,71 @@ class REPLState:
     capabilities: list[str] = field(default_factory=list)
     history_length: int = 0
 
-
-# Bootstrap code that runs in the subprocess
-REPL_BOOTSTRAP = textwrap.dedent('''
-    import sys
-    import json
-    import types
-    import inspect
-    import traceback
-    from io import StringIO
-
-    # Namespace for user code
-    _namespace = {"__builtins__": __builtins__}
-
-    # History of executed code blocks
-    _history = []
-
-    # Registered capabilities (native Python)
-    _capabilities = {}
-
-    # Relay capabilities (MCP-backed)
-    _relay_capabilities = {}
-
-    # Counter for relay request IDs
-    _relay_id = 0
-
-    def _serialize(value):
-        """Serialize a value to JSON-compatible format."""
-        if value is None:
-            return None
-        if isinstance(value, (bool, int, float, str)):
-            return value
-        if isinstance(value, (list, tuple)):
-            try:
-                return [_serialize(v) for v in value]
-            except Exception:
-                return repr(value)
-        if isinstance(value, dict):
-            try:
-                return {str(k): _serialize(v) for k, v in value.items()}
-            except Exception:
-                return repr(value)
-        # For objects, return a useful representation
-        return repr(value)
-
-    def _get_type_str(value):
-        """Get a string representation of a value's type."""
-        t = type(value).__name__
-        if isinstance(value, (list, tuple)) and value:
-            inner = type(value[0]).__name__
-            return f"{t}[{inner}, ...]" if len(value) > 1 else f"{t}[{inner}]"
-        if isinstance(value, dict) and value:
-            k, v = next(iter(value.items()))
-            return f"dict[{type(k).__name__}, {type(v).__name__}]"
-        return t
-
-    def _relay(capability: str, method: str, kwargs: dict):
-        """Relay a capability call to the harness.
-
-        This function sends a relay request to the harness and waits for the response.
-        It's used by RelayCapability objects to call MCP server tools.
-        """
-        global _relay_id
-        _relay_id += 1
-        request_id = f"relay_{_relay_id}"
-
-        # Send relay request to harness (via stdout)
-        request = {
-            "type": "relay_request",
-            "id": request_id,
-            "capability": capability,
-            "method": method,
-            "kwargs": kwargs,
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to a JSON-serializable dict without asdict's recursive copy."""
+        return {
+            "defined_functions": self.defined_functions,
+            "variables": self.variables,
+            "capabilities": self.capabilities,
+            "history_length": self.history_length,
         }
-        # Use the real stdout (not captured)
-        sys.__stdout__.write(json.dumps(request) + "\\n")
-        sys.__stdout__.flush()
 
-        # Wait for response on stdin
-        response_line = sys.__stdin__.readline()
-        if not response_line:
-            raise RuntimeError("Harness closed connection during relay")
 
-        response = json.loads(response_line)
-        if response.get("type") != "relay_response":
-            raise RuntimeError(f"Unexpected response type: {response.get('type')}")
-        if response.get("id") != request_id:
-            raise RuntimeError(f"Response ID mismatch: expected {request_id}")
 
-        if response.get("success"):
-            return response.get("result")
-        else:
-            raise RuntimeError(f"Relay call failed: {response.get('error')}")
-
-    class RelayCapability:
-        """A capability backed by an MCP server.
-
-        Method calls are relayed to the harness, which forwards them to
-        the backend MCP server.
-        """
 
-        def __init__(self, name: str, tools: dict):
-            self._name = name
-            self._tools = tools  # {method_name: {description: str, parameters: dict}}
-
-        @property
-        def name(self):
-            return self._name
-
-        @property
-        def description(self):
-            return f"MCP-backed capability with {len(self._tools)} tools"
-
-        def __getattr__(self, method: str):
-            if method.startswith("_"):
-                raise AttributeError(method)
-            if method not in self._tools:
-                available = ", ".join(self._tools.keys())
-                raise AttributeError(
-                    f"'{self._name}' has no method '{method}'. "
-                    f"Available: {available}"
-                )
-
-            def call(**kwargs):
-                return _relay(self._name, method, kwargs)
-
-            # Copy metadata
-            tool = self._tools[method]
-            call.__name__ = method
-            call.__doc__ = tool.get("description", "")
-            return call
-
-        def __repr__(self):
-            return f"<RelayCapability '{self._name}' with {len(self._tools)} methods>"
-
-        def __dir__(self):
-            return list(self._tools.keys()) + ["name", "description", "describe"]
-
-        def describe(self) -> str:
-            """Return documentation for this capability."""
-            lines = [f"{self._name} capability (MCP-backed):", ""]
-            for method, tool in self._tools.items():
-                desc = tool.get("description", "No description")
-                lines.append(f"  .{method}()")
-                lines.append(f"      {desc}")
-                lines.append("")
-            return "\\n".join(lines)
-
-    # Make RelayCapability available in namespace
-    _namespace["RelayCapability"] = RelayCapability
-    _namespace["_relay"] = _relay
-
-    def _execute(code: str) -> dict:
-        """Execute code and return result."""
-        stdout_capture = StringIO()
-        stderr_capture = StringIO()
-        result = {
-            "type": "execute_result",
-            "success": True,
-            "stdout": "",
-            "stderr": "",
-            "return_value": None,
-            "error_type": None,
-            "error_message": None,
-        }
+# Type for relay handler callback
+RelayHandler = Callable[[str, str, dict], Any]
 
-        old_stdout, old_stderr = sys.stdout, sys.stderr
-        try:
-            sys.stdout, sys.stderr = stdout_capture, stderr_capture
 
-            # Try to eval as expression first (to get return value)
-            try:
-                compiled = compile(code, "<repl>", "eval")
-                return_value = eval(compiled, _namespace)
-                result["return_value"] = _serialize(return_value)
-            except SyntaxError:
-                # Fall back to exec for statements
-                exec(code, _namespace)
+_CHILD_SOURCE = Path(__file__).with_name("_repl_child.py")
+_child_pyc: Path | None = None
 
-            _history.append(code)
 
-        except Exception as e:
-            result["success"] = False
-            result["error_type"] = type(e).__name__
-            result["error_message"] = str(e)
-            # Include traceback in stderr
-            stderr_capture.write(traceback.format_exc())
-        finally:
-            sys.stdout, sys.stderr = old_stdout, old_stderr
-            result["stdout"] = stdout_capture.getvalue()
-            result["stderr"] = stderr_capture.getvalue()
-
-        return result
-
-    def _get_state() -> dict:
-        """Get current REPL state."""
-        functions = []
-        variables = {}
-
-        for name, value in _namespace.items():
-            if name.startswith("_"):
-                continue
-            if name == "RelayCapability":
-                continue
-
-            if callable(value) and not isinstance(value, type):
-                # It's a function
-                try:
-                    sig = str(inspect.signature(value))
-                except (ValueError, TypeError):
-                    sig = "(...)"
-                doc = (value.__doc__ or "").split("\\n")[0]
-                functions.append({
-                    "name": name,
-                    "signature": sig,
-                    "docstring": doc,
-                })
-            elif not callable(value):
-                # It's a variable
-                variables[name] = _get_type_str(value)
-
-        # Combine native and relay capabilities
-        all_caps = list(_capabilities.keys()) + list(_relay_capabilities.keys())
+def _child_argv() -> list[str]:
+    """Interpreter argv for spawning the REPL child process.
 
-        return {
-            "defined_functions": functions,
-            "variables": variables,
-            "capabilities": all_caps,
-            "history_length": len(_history),
-        }
-
-    def _inject(name: str, code: str) -> dict:
-        """Inject code into namespace."""
+    The child script is self-contained (stdlib plus optional orjson), so
+    it runs directly by path — deliberately not via -m, which would
+    import the full agentself package (FastMCP and friends) into every
+    child. Its .pyc is compiled on first use so later spawns skip the
+    source parse; a read-only install falls back to the .py file.
+    """
+    global _child_pyc
+    if _child_pyc is None:
         try:
-            exec(code, _namespace)
-            _namespace[name] = _namespace.get(name)
-            return {"success": True}
-        except Exception as e:
-            return {"success": False, "error": str(e)}
-
-    def _inject_relay_capability(name: str, tools: dict) -> dict:
-        """Inject a relay capability into the namespace."""
+            pyc = Path(importlib.util.cache_from_source(str(_CHILD_SOURCE)))
+            if not pyc.exists() or pyc.stat().st_mtime < _CHILD_SOURCE.stat().st_mtime:
+                py_compile.compile(str(_CHILD_SOURCE), doraise=True)
+            _child_pyc = pyc
+        except OSError:
+            return [sys.executable, "-u", str(_CHILD_SOURCE)]
+    return [sys.executable, "-u", str(_child_pyc)]
+
+
+def _build_relay_response(relay_handler: RelayHandler | None, request: dict) -> dict:
+    """Run a relay request through the handler and build the reply dict."""
+    response = {
+        "type": "relay_response",
+        "id": request.get("id"),
+    }
+
+    if relay_handler is None:
+        response["success"] = False
+        response["error"] = "No relay handler configured"
+    else:
         try:
-            cap = RelayCapability(name, tools)
-            _namespace[name] = cap
-            _relay_capabilities[name] = cap
-            return {"success": True}
+            result = relay_handler(
+                request.get("capability"),
+                request.get("method"),
+                request.get("kwargs", {}),
+            )
+            response["success"] = True
+            response["result"] = result
         except Exception as e:
-            return {"success": False, "error": str(e)}
-
-    def _register_capability(name: str) -> dict:
-        """Register a capability from the namespace."""
-        if name not in _namespace:
-            return {"success": False, "error": f"'{name}' not found in namespace"}
-        cap = _namespace[name]
-        if not hasattr(cap, "name") or not hasattr(cap, "describe"):
-            return {"success": False, "error": f"'{name}' is not a valid capability (needs name and describe)"}
-        _capabilities[cap.name] = cap
-        return {"success": True, "capability_name": cap.name}
-
-    def _list_capabilities() -> dict:
-        """List registered capabilities."""
-        caps = []
-        for name, cap in _capabilities.items():
-            caps.append({
-                "name": name,
-                "type": "native",
-                "description": getattr(cap, "description", ""),
-            })
-        for name, cap in _relay_capabilities.items():
-            caps.append({
-                "name": name,
-                "type": "relay",
-                "description": getattr(cap, "description", ""),
-            })
-        return {"capabilities": caps}
-
-    def _find_definition_in_history(name: str, is_class: bool = False) -> str:
-        """Find the definition of a function or class in history."""
-        keyword = "class" if is_class else "def"
-        pattern = f"{keyword} {name}"
-
-        for code in reversed(_history):
-            if pattern in code:
-                # Found a potential definition
-                lines = code.strip().split("\\n")
-                for i, line in enumerate(lines):
-                    if line.strip().startswith(f"{keyword} {name}"):
-                        # Extract the full definition
-                        return code
-        return None
-
-    def _export_state() -> dict:
-        """Export full REPL state for persistence."""
-        functions = []
-        variables = []
-
-        for name, value in _namespace.items():
-            if name.startswith("_"):
-                continue
-            if name == "RelayCapability":
-                continue
-            # Skip registered capabilities (handled separately)
-            if name in _capabilities or name in _relay_capabilities:
-                continue
-
-            if callable(value) and not isinstance(value, type):
-                # It's a function - try to get source
-                source = None
-                try:
-                    source = inspect.getsource(value)
-                except (OSError, TypeError):
-                    # Can't get source via inspect, try history
-                    source = _find_definition_in_history(name, is_class=False)
-
-                if source:
-                    try:
-                        sig = str(inspect.signature(value))
-                    except (ValueError, TypeError):
-                        sig = "(...)"
-                    doc = (value.__doc__ or "").split("\\n")[0]
-                    functions.append({
-                        "name": name,
-                        "source": source,
-                        "signature": sig,
-                        "docstring": doc,
-                    })
-            elif isinstance(value, type):
-                # It's a class - try to get source
-                source = None
-                try:
-                    source = inspect.getsource(value)
-                except (OSError, TypeError):
-                    # Can't get source via inspect, try history
-                    source = _find_definition_in_history(name, is_class=True)
-
-                if source:
-                    functions.append({
-                        "name": name,
-                        "source": source,
-                        "signature": "",
-                        "docstring": (value.__doc__ or "").split("\\n")[0],
-                    })
-            else:
-                # It's a variable
-                var_entry = {"name": name}
-                # Try JSON serialization
-                try:
-                    json.dumps(value)
-                    var_entry["type"] = "json"
-                    var_entry["value"] = value
-                except (TypeError, ValueError):
-                    # Fall back to repr
-                    var_entry["type"] = "repr"
-                    var_entry["value"] = repr(value)
-                variables.append(var_entry)
-
-        # Export native capabilities (their class source)
-        native_caps = []
-        for name, cap in _capabilities.items():
-            cap_entry = {"name": name, "type": "native"}
-            try:
-                cap_entry["source"] = inspect.getsource(type(cap))
-            except (OSError, TypeError):
-                cap_entry["source"] = None
-            native_caps.append(cap_entry)
-
-        # Export relay capabilities (their tool specs)
-        relay_caps = []
-        for name, cap in _relay_capabilities.items():
-            relay_caps.append({
-                "name": name,
-                "type": "relay",
-                "tools": cap._tools,
-            })
-
-        return {
-            "functions": functions,
-            "variables": variables,
-            "native_capabilities": native_caps,
-            "relay_capabilities": relay_caps,
-            "history": _history.copy(),
-        }
-
-    def _import_state(state: dict) -> dict:
-        """Import state from persistence."""
-        results = {
-            "functions_restored": 0,
-            "functions_failed": [],
-            "variables_restored": 0,
-            "variables_failed": [],
-            "capabilities_restored": 0,
-            "capabilities_failed": [],
-        }
-
-        # Restore functions first (they may be used by variables)
-        for func in state.get("functions", []):
-            name = func["name"]
-            source = func.get("source")
-            if source:
-                try:
-                    exec(source, _namespace)
-                    results["functions_restored"] += 1
-                except Exception as e:
-                    results["functions_failed"].append({"name": name, "error": str(e)})
-
-        # Restore variables
-        for var in state.get("variables", []):
-            name = var["name"]
-            var_type = var.get("type", "json")
-            value = var.get("value")
-            if var_type == "json":
-                try:
-                    _namespace[name] = value
-                    results["variables_restored"] += 1
-                except Exception as e:
-                    results["variables_failed"].append({"name": name, "error": str(e)})
-            else:
-                # repr type - can't restore
-                results["variables_failed"].append({"name": name, "error": "repr-only value"})
-
-        # Restore native capabilities
-        for cap in state.get("native_capabilities", []):
-            name = cap["name"]
-            source = cap.get("source")
-            if source:
-                try:
-                    exec(source, _namespace)
-                    # Find the class and instantiate it
-                    # The source should define a class, we need to find it
-                    for n, v in list(_namespace.items()):
-                        if isinstance(v, type) and hasattr(v, "name") and hasattr(v, "describe"):
-                            # Instantiate and register
-                            instance = v()
-                            _namespace[instance.name] = instance
-                            _capabilities[instance.name] = instance
-                            results["capabilities_restored"] += 1
-                            break
-                except Exception as e:
-                    results["capabilities_failed"].append({"name": name, "error": str(e)})
-
-        # Note: relay capabilities are restored by the harness reconnecting to MCP servers
-        # We just record what needs to be restored
-        results["relay_capabilities_to_restore"] = [
-            c["name"] for c in state.get("relay_capabilities", [])
-        ]
-
-        # Restore history
-        _history.clear()
-        _history.extend(state.get("history", []))
-
-        return results
-
-    # IPC loop - read JSON from stdin, write JSON to stdout
-    while True:
-        try:
-            line = sys.stdin.readline()
-            if not line:
-                break
-
-            request = json.loads(line.strip())
-            req_type = request.get("type")
-
-            if req_type == "execute":
-                response = _execute(request["code"])
-            elif req_type == "state":
-                response = _get_state()
-            elif req_type == "inject":
-                response = _inject(request["name"], request["code"])
-            elif req_type == "inject_relay_capability":
-                response = _inject_relay_capability(request["name"], request["tools"])
-            elif req_type == "register_capability":
-                response = _register_capability(request["name"])
-            elif req_type == "list_capabilities":
-                response = _list_capabilities()
-            elif req_type == "export_state":
-                response = _export_state()
-            elif req_type == "import_state":
-                response = _import_state(request["state"])
-            elif req_type == "ping":
-                response = {"pong": True}
-            else:
-                response = {"error": f"Unknown request type: {req_type}"}
-
-            print(json.dumps(response), flush=True)
-
-        except json.JSONDecodeError as e:
-            print(json.dumps({"error": f"Invalid JSON: {e}"}), flush=True)
-        except Exception as e:
-            print(json.dumps({"error": f"Internal error: {e}"}), flush=True)
-''')
+            response["success"] = False
+            response["error"] = str(e)
 
-
-# Type for relay handler callback
-RelayHandler = Callable[[str, str, dict], Any]
+    return response
 
 
 class REPLSubprocess:
@@ -546,84 +114,90 @@ class REPLSubprocess:
                           return the result or raise an exception.
         """
         self.relay_handler = relay_handler
+        # Serializes request/response pairs on the pipe so concurrent
+        # callers (e.g. shared-mode runtime readers) cannot interleave
+        # frames. Held for whole roundtrips, not individual reads.
+        self._io_lock = threading.Lock()
         self.process = subprocess.Popen(
-            [sys.executable, "-u", "-c", REPL_BOOTSTRAP],
+            _child_argv(),
             stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            text=True,
-            bufsize=1,  # Line buffered
+            bufsize=65536,  # Binary pipes with a large buffer; flushed explicitly
         )
         # Verify subprocess started
         response = self._send_simple({"type": "ping"})
         if not response.get("pong"):
             raise RuntimeError("REPL subprocess failed to start")
 
-    def _send_simple(self, request: dict) -> dict:
-        """Send a request and get simple response (no relay handling)."""
-        if self.process.poll() is not None:
+    def _write_message(self, message: dict) -> None:
+        """Write one length-prefixed message to the subprocess."""
+        payload = dumps_bytes(message)
+        try:
+            # writelines avoids concatenating prefix and payload into a
+            # fresh bytes object; one flush still batches the syscall.
+            self.process.stdin.writelines((struct.pack("<I", len(payload)), payload))
+            self.process.stdin.flush()
+        except BrokenPipeError:
+            # Classify only on failure; no preemptive poll() syscall.
+            self.process.poll()
             raise RuntimeError("REPL subprocess has terminated")
 
-        self.process.stdin.write(json.dumps(request) + "\n")
-        self.process.stdin.flush()
+    def _read_message(self) -> dict:
+        """Read one length-prefixed message from the subprocess.
 
-        response_line = self.process.stdout.readline()
-        if not response_line:
+        Execute results carry stdout/stderr as raw bytes after the JSON
+        header (see _write_execute_result in the bootstrap); reattach
+        them here so callers see plain string fields.
+        """
+        header = self.process.stdout.read(4)
+        if len(header) < 4:
+            self.process.poll()
             raise RuntimeError("REPL subprocess closed stdout")
+        (length,) = struct.unpack("<I", header)
+        response = loads(self.process.stdout.read(length))
 
-        return json.loads(response_line)
+        # Batch replies are lists; only dict responses carry the streams.
+        if not isinstance(response, dict):
+            return response
+        stdout_len = response.pop("stdout_len", None)
+        if stdout_len is not None:
+            stderr_len = response.pop("stderr_len", 0)
+            response["stdout"] = self.process.stdout.read(stdout_len).decode("utf-8")
+            response["stderr"] = self.process.stdout.read(stderr_len).decode("utf-8")
+        return response
 
-    def _send_with_relay(self, request: dict) -> dict:
-        """Send a request and handle relay calls during execution."""
-        if self.process.poll() is not None:
-            raise RuntimeError("REPL subprocess has terminated")
+    def _send_simple(self, request: dict) -> dict:
+        """Send a request and get simple response (no relay handling).
 
-        self.process.stdin.write(json.dumps(request) + "\n")
-        self.process.stdin.flush()
+        Liveness is detected from pipe failures (BrokenPipeError / short
+        read) rather than a poll() syscall per roundtrip.
+        """
+        with self._io_lock:
+            self._write_message(request)
+            return self._read_message()
 
-        # Read responses, handling relay requests
-        while True:
-            response_line = self.process.stdout.readline()
-            if not response_line:
-                raise RuntimeError("REPL subprocess closed stdout")
+    def _send_with_relay(self, request: dict) -> dict:
+        """Send a request and handle relay calls during execution."""
+        with self._io_lock:
+            self._write_message(request)
 
-            response = json.loads(response_line)
+            # Read responses, handling relay requests
+            while True:
+                response = self._read_message()
 
-            if response.get("type") == "relay_request":
-                # Handle relay request
-                relay_response = self._handle_relay(response)
-                self.process.stdin.write(json.dumps(relay_response) + "\n")
-                self.process.stdin.flush()
-                continue
+                if response.get("type") == "relay_request":
+                    # Handle relay request
+                    relay_response = self._handle_relay(response)
+                    self._write_message(relay_response)
+                    continue
 
-            # Got the actual response
-            return response
+                # Got the actual response
+                return response
 
     def _handle_relay(self, request: dict) -> dict:
         """Handle a relay request from the subprocess."""
-        request_id = request.get("id")
-        capability = request.get("capability")
-        method = request.get("method")
-        kwargs = request.get("kwargs", {})
-
-        response = {
-            "type": "relay_response",
-            "id": request_id,
-        }
-
-        if self.relay_handler is None:
-            response["success"] = False
-            response["error"] = "No relay handler configured"
-        else:
-            try:
-                result = self.relay_handler(capability, method, kwargs)
-                response["success"] = True
-                response["result"] = result
-            except Exception as e:
-                response["success"] = False
-                response["error"] = str(e)
-
-        return response
+        return _build_relay_response(self.relay_handler, request)
 
     def execute(self, code: str) -> ExecutionResult:
         """Execute Python code in the REPL.
@@ -644,6 +218,29 @@ class REPLSubprocess:
             error_message=response.get("error_message"),
         )
 
+    def execute_as_dict(self, code: str) -> dict:
+        """Execute code and return the raw protocol dict.
+
+        Carries the same keys as ExecutionResult.to_dict(); callers that
+        immediately serialize the result (the server's execute tool)
+        skip the dataclass round-trip entirely.
+        """
+        response = self._send_with_relay({"type": "execute", "code": code})
+        response.pop("type", None)
+        return response
+
+    async def aexecute(self, code: str) -> ExecutionResult:
+        """Awaitable execute for event-loop callers.
+
+        Runs the blocking execute on the default executor so the event
+        loop keeps serving other work (attach connections, MCP traffic)
+        while the child runs user code. Callers still serialize on the
+        runtime lock, not the loop. For driving many REPLs from one
+        loop, prefer AsyncREPLSubprocess.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.execute, code)
+
     def state(self) -> REPLState:
         """Get current state of the REPL.
 
@@ -671,6 +268,48 @@ class REPLSubprocess:
         response = self._send_simple({"type": "inject", "name": name, "code": code})
         return response.get("success", False)
 
+    def batch(self, requests: list[dict]) -> list[dict]:
+        """Execute several requests in one IPC roundtrip.
+
+        Sub-requests run in order on the simple (no-relay) path, so code
+        executed this way must not make relay calls.
+
+        Args:
+            requests: Raw request dicts, the same shapes the individual
+                      methods send (e.g., {"type": "inject", ...}).
+
+        Returns:
+            One response dict per sub-request, in order.
+        """
+        return self._send_simple({"type": "batch", "requests": requests})
+
+    def send_batch(self, requests: list[dict]) -> list[dict]:
+        """Pipeline several requests: write every frame, flush once, drain replies.
+
+        Unlike batch(), each request stays a separate frame handled by
+        the subprocess loop, so large responses stream back one frame at
+        a time. The protocol is strictly ordered, so replies are drained
+        in submission order; requests must not trigger relay calls.
+
+        Args:
+            requests: Raw request dicts, the same shapes the individual
+                      methods send.
+
+        Returns:
+            One response dict per request, in order.
+        """
+        stdin = self.process.stdin
+        with self._io_lock:
+            try:
+                for request in requests:
+                    payload = dumps_bytes(request)
+                    stdin.writelines((struct.pack("<I", len(payload)), payload))
+                stdin.flush()
+            except BrokenPipeError:
+                self.process.poll()
+                raise RuntimeError("REPL subprocess has terminated")
+            return [self._read_message() for _ in requests]
+
     def inject_relay_capability(self, name: str, tools: dict) -> bool:
         """Inject a relay capability into the REPL.
 
@@ -704,6 +343,20 @@ class REPLSubprocess:
             return response.get("capability_name")
         return None
 
+    def reset(self) -> bool:
+        """Clear the REPL back to a fresh namespace without respawning."""
+        response = self._send_simple({"type": "reset"})
+        return response.get("success", False)
+
+    def get_traceback(self) -> str | None:
+        """Get the formatted traceback of the last failed execute, if any.
+
+        Tracebacks are formatted on demand in the subprocess; execute
+        responses carry only the error type and message.
+        """
+        response = self._send_simple({"type": "get_traceback"})
+        return response.get("traceback")
+
     def list_capabilities(self) -> list[dict]:
         """List registered capabilities.
 
@@ -713,6 +366,33 @@ class REPLSubprocess:
         response = self._send_simple({"type": "list_capabilities"})
         return response.get("capabilities", [])
 
+    def snapshot(self) -> dict:
+        """Get state, capabilities, and exported state in one roundtrip.
+
+        Returns:
+            Dict with "state", "capabilities", and "export" keys, matching
+            what state(), list_capabilities(), and export_state() return.
+        """
+        return self._send_simple({"type": "snapshot"})
+
+    def export_state_stream(self):
+        """Stream exported state as (kind, data) records.
+
+        Kinds are "function", "variable", "native_capability",
+        "relay_capability", and "history". Lets consumers process large
+        exports without one multi-MB frame on either side.
+
+        Yields:
+            (kind, data) tuples until the export is complete.
+        """
+        with self._io_lock:
+            self._write_message({"type": "export_state_stream"})
+            while True:
+                response = self._read_message()
+                if response.get("type") == "export_end":
+                    return
+                yield response.get("kind"), response.get("data")
+
     def export_state(self) -> dict:
         """Export full REPL state for persistence.
 
@@ -743,3 +423,226 @@ class REPLSubprocess:
 
     def __exit__(self, *args):
         self.close()
+
+
+class AsyncREPLSubprocess:
+    """Asyncio variant of REPLSubprocess.
+
+    One event loop can drive several REPL subprocesses concurrently
+    without a thread per process. Requests to a single subprocess are
+    serialized with an asyncio.Lock; relay handlers run inline.
+    """
+
+    def __init__(self, relay_handler: RelayHandler | None = None):
+        """Prepare the client; call start() to launch the subprocess.
+
+        Args:
+            relay_handler: Callback for handling relay requests.
+                          Called with (capability, method, kwargs) and should
+                          return the result or raise an exception.
+        """
+        self.relay_handler = relay_handler
+        self.process: asyncio.subprocess.Process | None = None
+        self._lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        """Start the REPL subprocess and verify it responds."""
+        self.process = await asyncio.create_subprocess_exec(
+            *_child_argv(),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        response = await self._send({"type": "ping"})
+        if not response.get("pong"):
+            raise RuntimeError("REPL subprocess failed to start")
+
+    async def _write_message(self, message: dict) -> None:
+        """Write one length-prefixed message to the subprocess."""
+        payload = dumps_bytes(message)
+        try:
+            self.process.stdin.writelines((struct.pack("<I", len(payload)), payload))
+            await self.process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            raise RuntimeError("REPL subprocess has terminated")
+
+    async def _read_message(self) -> dict:
+        """Read one length-prefixed message from the subprocess.
+
+        Execute results carry stdout/stderr as raw bytes after the JSON
+        header; reattach them so callers see plain string fields.
+        """
+        try:
+            header = await self.process.stdout.readexactly(4)
+            (length,) = struct.unpack("<I", header)
+            response = loads(await self.process.stdout.readexactly(length))
+
+            # Batch replies are lists; only dict responses carry the streams.
+            if not isinstance(response, dict):
+                return response
+            stdout_len = response.pop("stdout_len", None)
+            if stdout_len is not None:
+                stderr_len = response.pop("stderr_len", 0)
+                stdout = await self.process.stdout.readexactly(stdout_len)
+                stderr = await self.process.stdout.readexactly(stderr_len)
+                response["stdout"] = stdout.decode("utf-8")
+                response["stderr"] = stderr.decode("utf-8")
+            return response
+        except asyncio.IncompleteReadError:
+            raise RuntimeError("REPL subprocess closed stdout")
+
+    async def _send(self, request: dict) -> dict:
+        """Send a request and read its response, handling relay calls."""
+        if self.process is None:
+            raise RuntimeError("REPL subprocess not started")
+
+        async with self._lock:
+            await self._write_message(request)
+
+            while True:
+                response = await self._read_message()
+
+                if response.get("type") == "relay_request":
+                    relay_response = _build_relay_response(self.relay_handler, response)
+                    await self._write_message(relay_response)
+                    continue
+
+                return response
+
+    async def execute(self, code: str) -> ExecutionResult:
+        """Execute Python code in the REPL.
+
+        Args:
+            code: Python code to execute (can be multi-line).
+
+        Returns:
+            ExecutionResult with success status, output, and any errors.
+        """
+        response = await self._send({"type": "execute", "code": code})
+        return ExecutionResult(
+            success=response.get("success", False),
+            stdout=response.get("stdout", ""),
+            stderr=response.get("stderr", ""),
+            return_value=response.get("return_value"),
+            error_type=response.get("error_type"),
+            error_message=response.get("error_message"),
+        )
+
+    async def state(self) -> REPLState:
+        """Get current state of the REPL.
+
+        Returns:
+            REPLState with defined functions, variables, and capabilities.
+        """
+        response = await self._send({"type": "state"})
+        return REPLState(
+            defined_functions=response.get("defined_functions", []),
+            variables=response.get("variables", {}),
+            capabilities=response.get("capabilities", []),
+            history_length=response.get("history_length", 0),
+        )
+
+    async def inject(self, name: str, code: str) -> bool:
+        """Inject code into the REPL namespace."""
+        response = await self._send({"type": "inject", "name": name, "code": code})
+        return response.get("success", False)
+
+    async def batch(self, requests: list[dict]) -> list[dict]:
+        """Execute several requests in one IPC roundtrip."""
+        return await self._send({"type": "batch", "requests": requests})
+
+    async def close(self) -> None:
+        """Terminate the subprocess."""
+        if self.process is None or self.process.returncode is not None:
+            return
+        self.process.terminate()
+        try:
+            await asyncio.wait_for(self.process.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            self.process.kill()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+
+class REPLPool:
+    """Warm pool of idle REPL subprocesses.
+
+    Spawning a REPL costs fork+exec plus interpreter startup; the pool
+    keeps pre-started idle subprocesses so acquire() is a list pop on
+    the hot path. Released REPLs are reset to a fresh namespace and
+    returned; a background thread refills the pool after each acquire.
+    """
+
+    def __init__(self, size: int = 2, relay_handler: RelayHandler | None = None):
+        """Start the pool and pre-spawn `size` idle REPLs.
+
+        Args:
+            size: Target number of idle subprocesses to keep warm.
+            relay_handler: Passed through to each REPLSubprocess.
+        """
+        self.size = size
+        self.relay_handler = relay_handler
+        self._idle: list[REPLSubprocess] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self._refill()
+
+    def _refill(self) -> None:
+        """Spawn subprocesses until the pool holds `size` idle REPLs."""
+        while True:
+            with self._lock:
+                if self._closed or len(self._idle) >= self.size:
+                    return
+            repl = REPLSubprocess(relay_handler=self.relay_handler)
+            with self._lock:
+                if not self._closed and len(self._idle) < self.size:
+                    self._idle.append(repl)
+                    continue
+            repl.close()
+            return
+
+    def acquire(self) -> REPLSubprocess:
+        """Take a warm REPL from the pool (spawning only if empty)."""
+        with self._lock:
+            repl = self._idle.pop() if self._idle else None
+        threading.Thread(target=self._refill, daemon=True).start()
+        if repl is None:
+            repl = REPLSubprocess(relay_handler=self.relay_handler)
+        return repl
+
+    def release(self, repl: REPLSubprocess) -> None:
+        """Reset a REPL and return it to the pool.
+
+        Dead REPLs, and any beyond the target size, are closed instead.
+        """
+        try:
+            if not repl.reset():
+                repl.close()
+                return
+        except RuntimeError:
+            repl.close()
+            return
+        with self._lock:
+            if not self._closed and len(self._idle) < self.size:
+                self._idle.append(repl)
+                return
+        repl.close()
+
+    def close(self) -> None:
+        """Close all idle subprocesses and stop refilling."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for repl in idle:
+            repl.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
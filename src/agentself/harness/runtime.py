@@ -3,17 +3,150 @@
 from __future__ import annotations
 
 import asyncio
+import concurrent.futures
+import hashlib
 import logging
 import threading
-from dataclasses import dataclass
-from typing import Any, Callable
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator
 
 from agentself.harness.hub import MCPHub
+from agentself.harness.jsonio import dumps_bytes
 from agentself.harness.repl import REPLSubprocess
 from agentself.harness.state import StateManager
 
 logger = logging.getLogger(__name__)
 
+_MISS = object()
+
+
+class RWLock:
+    """Readers-writer lock for the shared runtime.
+
+    Read-only tools (state, list_*, describe) take shared mode and can
+    overlap; mutating tools (execute, install, reset) take exclusive
+    mode. Writers are preferred: once a writer is waiting, new readers
+    block, so a steady stream of state polls cannot starve execute.
+    """
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    def acquire_read(self, timeout: float | None = None) -> bool:
+        """Take the lock in shared mode."""
+        with self._cond:
+            ok = self._cond.wait_for(
+                lambda: not self._writer and not self._writers_waiting, timeout
+            )
+            if not ok:
+                return False
+            self._readers += 1
+            return True
+
+    def release_read(self) -> None:
+        """Release a shared hold."""
+        with self._cond:
+            self._readers -= 1
+            if self._readers == 0:
+                self._cond.notify_all()
+
+    def acquire_write(self, blocking: bool = True, timeout: float | None = None) -> bool:
+        """Take the lock in exclusive mode."""
+        with self._cond:
+            if not blocking:
+                if self._writer or self._readers:
+                    return False
+                self._writer = True
+                return True
+            self._writers_waiting += 1
+            try:
+                ok = self._cond.wait_for(
+                    lambda: not self._writer and not self._readers, timeout
+                )
+            finally:
+                self._writers_waiting -= 1
+            if not ok:
+                return False
+            self._writer = True
+            return True
+
+    def release_write(self) -> None:
+        """Release an exclusive hold."""
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
+
+    def write_locked(self) -> bool:
+        """Return True if a writer currently holds the lock."""
+        with self._cond:
+            return self._writer
+
+
+class RelayCache:
+    """LRU + TTL cache for relay (MCP tool) results.
+
+    Repeated idempotent tool calls skip the MCP roundtrip within the
+    TTL. Results carrying a `_meta.cache_hint == "no-cache"` dict are
+    never stored, and invalidate() forces a refresh.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(capability: str, method: str, kwargs: dict) -> tuple:
+        digest = hashlib.blake2b(dumps_bytes(kwargs), digest_size=16).digest()
+        return (capability, method, digest)
+
+    def get(self, key: tuple) -> Any:
+        """Return the cached value for key, or _MISS."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISS
+            expires, value = entry
+            if expires < now:
+                del self._entries[key]
+                return _MISS
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: tuple, value: Any) -> None:
+        """Store a value unless it opts out via _meta.cache_hint."""
+        if isinstance(value, dict):
+            meta = value.get("_meta")
+            if isinstance(meta, dict) and meta.get("cache_hint") == "no-cache":
+                return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, capability: str, method: str | None = None) -> None:
+        """Drop cached results for a capability (optionally one method)."""
+        with self._lock:
+            for key in list(self._entries):
+                if key[0] == capability and (method is None or key[1] == method):
+                    del self._entries[key]
+
+    def clear(self) -> None:
+        """Drop every cached result."""
+        with self._lock:
+            self._entries.clear()
+
+
 @dataclass
 class HarnessRuntime:
     """Shared state for the MCP server and attach server."""
@@ -21,30 +154,136 @@ class HarnessRuntime:
     repl: REPLSubprocess
     hub: MCPHub
     state_manager: StateManager
-    lock: threading.Lock
+    lock: RWLock
     relay_handler: Callable[[str, str, dict], Any]
 
+    relay_loop: asyncio.AbstractEventLoop | None = None
+    """Long-lived event loop (on a daemon thread) that serves relay calls."""
+
+    relay_cache: RelayCache = field(default_factory=RelayCache)
+    """TTL cache consulted by relay_handler before hitting the hub."""
+
+    descriptions: dict[str, str] = field(default_factory=dict)
+    """Capability descriptions captured at install/register time.
+
+    Serving describe_capability from here skips a REPL roundtrip for
+    static documentation.
+    """
+
+    caps_version: int = 0
+    """Monotonic counter bumped whenever the capability set changes.
+
+    Callers that cache capability listings compare against this to know
+    when their cache is stale.
+    """
+
+    caps_cache: list[dict] | None = None
+    """Cached list_capabilities response; dropped on every caps bump."""
+
+    output_store: OrderedDict[str, str] = field(default_factory=OrderedDict)
+    """Full output of large execute results, keyed by resource id."""
+
+    spare_repl: REPLSubprocess | None = None
+    """Pre-warmed replacement subprocess consumed by reset()."""
+
+    _spare_lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def bump_caps_version(self) -> None:
+        """Invalidate any cached capability listings."""
+        self.caps_version += 1
+        self.caps_cache = None
+
     def acquire(self, wait: bool = True, timeout: float | None = None) -> bool:
-        """Acquire the runtime lock."""
+        """Acquire the runtime lock in exclusive (writer) mode."""
         if not wait:
-            return self.lock.acquire(blocking=False)
-        if timeout is None:
-            return self.lock.acquire()
-        return self.lock.acquire(timeout=timeout)
+            return self.lock.acquire_write(blocking=False)
+        return self.lock.acquire_write(timeout=timeout)
 
     def release(self) -> None:
-        """Release the runtime lock."""
-        if self.lock.locked():
-            self.lock.release()
+        """Release an exclusive hold on the runtime lock."""
+        if self.lock.write_locked():
+            self.lock.release_write()
+
+    def acquire_read(self, timeout: float | None = None) -> bool:
+        """Acquire the runtime lock in shared (reader) mode."""
+        return self.lock.acquire_read(timeout=timeout)
+
+    def release_read(self) -> None:
+        """Release a shared hold on the runtime lock."""
+        self.lock.release_read()
 
     def busy(self) -> bool:
-        """Return True if the REPL is currently in use."""
-        return self.lock.locked()
+        """Return True if a writer currently holds the REPL."""
+        return self.lock.write_locked()
+
+    @contextmanager
+    def locked(self) -> Iterator["HarnessRuntime"]:
+        """Hold the runtime exclusively for the duration of a with block."""
+        self.acquire()
+        try:
+            yield self
+        finally:
+            self.release()
+
+    @contextmanager
+    def read_locked(self) -> Iterator["HarnessRuntime"]:
+        """Hold the runtime in shared mode for the duration of a with block."""
+        self.acquire_read()
+        try:
+            yield self
+        finally:
+            self.release_read()
+
+    def stash_output(self, text: str, bound: int = 32) -> str:
+        """Store large execute output and return its resource id.
+
+        The store is LRU-bounded so abandoned outputs do not accumulate.
+        """
+        uid = uuid.uuid4().hex
+        store = self.output_store
+        store[uid] = text
+        while len(store) > bound:
+            store.popitem(last=False)
+        return uid
+
+    def take_spare(self) -> REPLSubprocess | None:
+        """Pop the pre-warmed spare REPL, if one is ready."""
+        with self._spare_lock:
+            spare, self.spare_repl = self.spare_repl, None
+        return spare
+
+    def prewarm_spare(self) -> None:
+        """Ready a replacement REPL on a background thread.
+
+        Mirrors REPLPool's refill: the fork + interpreter start happens
+        off the request path so the next reset() can swap in a live
+        subprocess instead of waiting for one.
+        """
+
+        def _spawn() -> None:
+            repl = REPLSubprocess(relay_handler=self.relay_handler)
+            with self._spare_lock:
+                if self.spare_repl is None:
+                    self.spare_repl = repl
+                    repl = None
+            if repl is not None:  # lost the race; another spare exists
+                repl.close()
+
+        threading.Thread(target=_spawn, daemon=True, name="repl-prewarm").start()
 
     async def aclose(self) -> None:
         """Async cleanup for the runtime."""
         await self.hub.close()
         self.repl.close()
+        spare = self.take_spare()
+        if spare is not None:
+            spare.close()
+        self._stop_relay_loop()
+
+    def _stop_relay_loop(self) -> None:
+        """Stop the background relay loop thread, if running."""
+        if self.relay_loop is not None and self.relay_loop.is_running():
+            self.relay_loop.call_soon_threadsafe(self.relay_loop.stop)
 
     def close(self) -> None:
         """Sync cleanup for the runtime."""
@@ -53,25 +292,71 @@ class HarnessRuntime:
         except RuntimeError:
             # If a loop is already running, do best-effort sync cleanup.
             self.repl.close()
+            spare = self.take_spare()
+            if spare is not None:
+                spare.close()
+            self._stop_relay_loop()
 
 
 _runtime: HarnessRuntime | None = None
+_runtime_lock = threading.Lock()
 
 
 def create_runtime() -> HarnessRuntime:
     """Create a new runtime with shared REPL, hub, and state manager."""
     hub = MCPHub()
     state_manager = StateManager()
-    lock = threading.Lock()
+    lock = RWLock()
+
+    # One long-lived loop on a daemon thread serves every relay call;
+    # creating (and closing) a loop per call cost around a millisecond
+    # each time and threw away connection state between calls.
+    relay_loop = asyncio.new_event_loop()
+    threading.Thread(
+        target=relay_loop.run_forever, daemon=True, name="relay-loop"
+    ).start()
+
+    relay_cache = RelayCache()
+
+    # Identical calls issued while one is already on the wire join its
+    # in-flight future instead of hitting the hub again.
+    inflight: dict[tuple, concurrent.futures.Future] = {}
+    inflight_lock = threading.Lock()
 
     def relay_handler(capability: str, method: str, kwargs: dict) -> Any:
         """Handle relay calls from the REPL by forwarding to MCP hub."""
-        logger.debug("relay call capability=%s method=%s kwargs=%s", capability, method, kwargs)
-        loop = asyncio.new_event_loop()
+        key = RelayCache.make_key(capability, method, kwargs)
+        cached = relay_cache.get(key)
+        if cached is not _MISS:
+            logger.debug("relay cache hit capability=%s method=%s", capability, method)
+            return cached
+
+        with inflight_lock:
+            existing = inflight.get(key)
+            if existing is not None:
+                joined = True
+                future = existing
+            else:
+                joined = False
+                future = asyncio.run_coroutine_threadsafe(
+                    hub.call(capability, method, kwargs), relay_loop
+                )
+                inflight[key] = future
+        if joined:
+            logger.debug(
+                "relay coalesced capability=%s method=%s", capability, method
+            )
+            return future.result()
+        logger.debug(
+            "relay call capability=%s method=%s kwargs=%s", capability, method, kwargs
+        )
         try:
-            return loop.run_until_complete(hub.call(capability, method, kwargs))
+            result = future.result()
         finally:
-            loop.close()
+            with inflight_lock:
+                inflight.pop(key, None)
+        relay_cache.put(key, result)
+        return result
 
     repl = REPLSubprocess(relay_handler=relay_handler)
     return HarnessRuntime(
@@ -80,20 +365,29 @@ def create_runtime() -> HarnessRuntime:
         state_manager=state_manager,
         lock=lock,
         relay_handler=relay_handler,
+        relay_loop=relay_loop,
+        relay_cache=relay_cache,
     )
 
 
 def get_runtime() -> HarnessRuntime:
-    """Get or create the global runtime."""
+    """Get or create the global runtime.
+
+    Double-checked locking keeps concurrent first callers from each
+    spawning their own REPL subprocess.
+    """
     global _runtime
     if _runtime is None:
-        _runtime = create_runtime()
+        with _runtime_lock:
+            if _runtime is None:
+                _runtime = create_runtime()
     return _runtime
 
 
 def reset_runtime() -> None:
     """Reset the global runtime (primarily for tests)."""
     global _runtime
-    if _runtime is not None:
-        _runtime.close()
-    _runtime = None
+    with _runtime_lock:
+        runtime, _runtime = _runtime, None
+    if runtime is not None:
+        runtime.close()
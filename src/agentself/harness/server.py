@@ -6,28 +6,62 @@ Integrates with backend MCP servers via the hub.
 
 from __future__ import annotations
 
-import argparse
 import asyncio
 import logging
-import sys
-import threading
-from dataclasses import asdict
-from pathlib import Path
 from typing import Any
 
 from fastmcp import FastMCP
 
-from agentself.harness.attach_server import AttachServer
-from agentself.harness.bootstrap import bootstrap_safe
-from agentself.harness.logging_utils import abbreviate, configure_logging
-from agentself.harness.mcp_config import install_from_config
-from agentself.paths import SAFE_ROOT
+from agentself.harness.hub import MCPHub
+from agentself.harness.logging_utils import abbreviate
 from agentself.harness.repl import REPLSubprocess
 from agentself.harness.runtime import HarnessRuntime, get_runtime
-from agentself.harness.state import SavedState, SavedCapability
+from agentself.harness.state import SavedCapability, SavedState
 
 logger = logging.getLogger(__name__)
 
+# Execute output larger than this moves to an exec-output:// resource;
+# the tool result keeps a preview so small consumers skip megabytes of
+# JSON escaping.
+OUTPUT_INLINE_LIMIT = 16 * 1024
+OUTPUT_PREVIEW_LIMIT = 1024
+
+
+def _install_fast_serializer() -> None:
+    """Route FastMCP tool-result encoding through orjson when available.
+
+    Tool returns are dicts of JSON-ready primitives, so the pydantic
+    dump + stdlib encode FastMCP does by default is pure overhead.
+    FastMCP 4 dropped the public tool_serializer hook, so this swaps the
+    module-level default_serializer instead; anything orjson cannot
+    encode falls back to the original serializer, and any fastmcp
+    layout change just leaves the default in place.
+    """
+    try:
+        import orjson
+        from fastmcp.tools import base as _fastmcp_tools_base
+    except ImportError:
+        return
+
+    # getattr, not attribute read: if a future fastmcp drops the hook
+    # this stays a no-op instead of an AttributeError at import.
+    original = getattr(_fastmcp_tools_base, "default_serializer", None)
+    if original is None:
+        return
+
+    def _orjson_serializer(data: Any) -> str:
+        try:
+            return orjson.dumps(
+                data, option=orjson.OPT_NON_STR_KEYS, default=str
+            ).decode()
+        except TypeError:
+            return original(data)
+
+    _fastmcp_tools_base.default_serializer = _orjson_serializer
+
+
+_install_fast_serializer()
+
 
 def create_server(
     name: str = "agentself-repl",
@@ -43,10 +77,10 @@ def create_server(
     """
     mcp = FastMCP(name)
 
+    # Tools capture only `runtime`; the live repl/hub/state_manager are
+    # read at call time so reset()'s subprocess swap is picked up and a
+    # replaced runtime's resources are not pinned by closure cells.
     runtime = runtime or get_runtime()
-    repl = runtime.repl
-    hub = runtime.hub
-    state_manager = runtime.state_manager
 
     @mcp.tool()
     def execute(code: str) -> dict[str, Any]:
@@ -80,18 +114,52 @@ def create_server(
             # Use an installed capability
             execute("files = fs.list('*.py')")
         """
-        logger.debug("execute code=%s", abbreviate(code))
-        runtime.acquire()
-        try:
-            result = repl.execute(code)
+        # abbreviate would run before logging filters the record; gate it
+        # so disabled debug logging costs nothing per call.
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("execute code=%s", abbreviate(code))
+        with runtime.locked():
+            # Read repl under the lock: reset() swaps and closes it.
+            # The protocol dict already has the response shape, so the
+            # hot path skips the ExecutionResult construct + to_dict.
+            payload = runtime.repl.execute_as_dict(code)
+        if logger.isEnabledFor(logging.DEBUG):
             logger.debug(
                 "execute result success=%s error_type=%s",
-                result.success,
-                result.error_type,
+                payload.get("success"),
+                payload.get("error_type"),
             )
-            return asdict(result)
-        finally:
-            runtime.release()
+        stdout = payload["stdout"]
+        stderr = payload["stderr"]
+        if len(stdout) + len(stderr) > OUTPUT_INLINE_LIMIT:
+            full = stdout
+            if stderr:
+                full = f"{full}\n--- stderr ---\n{stderr}"
+            uid = runtime.stash_output(full)
+            payload["stdout"] = stdout[:OUTPUT_PREVIEW_LIMIT]
+            payload["stderr"] = stderr[:OUTPUT_PREVIEW_LIMIT]
+            payload["output_truncated"] = True
+            payload["output_resource"] = f"exec-output://{uid}"
+        return payload
+
+    @mcp.resource("exec-output://{output_id}")
+    def exec_output(output_id: str) -> str:
+        """Full stdout/stderr of a large execute result."""
+        return runtime.output_store.get(output_id, "")
+
+    @mcp.tool()
+    def get_traceback() -> dict[str, Any]:
+        """Get the full traceback of the last failed execute.
+
+        Execute responses carry only the error type and message; the
+        traceback is formatted on demand in the REPL subprocess.
+
+        Returns:
+            Dict with traceback string, or None if nothing has failed.
+        """
+        with runtime.read_locked():
+            tb = runtime.repl.get_traceback()
+        return {"traceback": tb}
 
     @mcp.tool()
     def state() -> dict[str, Any]:
@@ -105,12 +173,9 @@ def create_server(
             - history_length: Number of code blocks executed
         """
         logger.debug("state requested")
-        runtime.acquire()
-        try:
-            result = repl.state()
-            return asdict(result)
-        finally:
-            runtime.release()
+        with runtime.read_locked():
+            result = runtime.repl.state()
+        return result.to_dict()
 
     @mcp.tool()
     def register_capability(name: str) -> dict[str, Any]:
@@ -129,15 +194,19 @@ def create_server(
             Dict with success status and capability name or error.
         """
         logger.info("register capability name=%s", name)
-        runtime.acquire()
-        try:
+        with runtime.locked():
+            repl = runtime.repl
             result = repl.register_capability(name)
             if result:
+                runtime.bump_caps_version()
+                # Cache the documentation now so describe_capability can
+                # answer without a REPL roundtrip.
+                described = repl.execute(f"{result}.describe()")
+                if described.success and isinstance(described.return_value, str):
+                    runtime.descriptions[result] = described.return_value
                 return {"success": True, "capability_name": result}
             else:
                 return {"success": False, "error": f"Failed to register '{name}'"}
-        finally:
-            runtime.release()
 
     @mcp.tool()
     async def install_capability(
@@ -175,31 +244,45 @@ def create_server(
             execute("files = fs.list_directory('.')")
         """
         logger.info("install capability name=%s command=%s", name, command)
-        runtime.acquire()
+        hub = runtime.hub
         try:
-            # Connect to MCP server and get tools
+            # Connect to MCP server and get tools. The slow part — the
+            # server spawn and MCP handshake — runs without the runtime
+            # lock so state polls are not blocked behind it; the hub
+            # serializes its own registry internally.
             tools = await hub.install(name, command, args=args, env=env, cwd=cwd)
 
-            # Prepare tool specs for the REPL
-            tool_specs = {
-                t.name: {"description": t.description, "parameters": t.parameters}
-                for t in tools
-            }
+            # Prepare tool specs for the REPL; one pass collects the
+            # names reused by the log line, response, and description.
+            tool_names: list[str] = []
+            tool_specs: dict[str, dict[str, Any]] = {}
+            for t in tools:
+                tool_names.append(t.name)
+                tool_specs[t.name] = {
+                    "description": t.description,
+                    "parameters": t.parameters,
+                }
 
             # Inject relay capability into REPL
-            success = repl.inject_relay_capability(name, tool_specs)
+            with runtime.locked():
+                success = runtime.repl.inject_relay_capability(name, tool_specs)
 
             if success:
+                runtime.bump_caps_version()
+                description = (
+                    f"MCP-backed capability with tools: {', '.join(tool_names)}"
+                )
+                runtime.descriptions[name] = description
                 logger.info(
                     "installed capability name=%s tools=%s",
                     name,
-                    [t.name for t in tools],
+                    tool_names,
                 )
                 return {
                     "success": True,
                     "capability_name": name,
-                    "tools": [t.name for t in tools],
-                    "description": f"MCP-backed capability with tools: {', '.join(t.name for t in tools)}",
+                    "tools": tool_names,
+                    "description": description,
                 }
             else:
                 await hub.uninstall(name)
@@ -208,8 +291,6 @@ def create_server(
         except Exception as e:
             logger.exception("install capability failed name=%s", name)
             return {"success": False, "error": str(e)}
-        finally:
-            runtime.release()
 
     @mcp.tool()
     async def uninstall_capability(name: str) -> dict[str, Any]:
@@ -225,12 +306,15 @@ def create_server(
             Dict with success status.
         """
         logger.info("uninstall capability name=%s", name)
-        runtime.acquire()
-        try:
-            success = await hub.uninstall(name)
+        with runtime.locked():
+            success = await runtime.hub.uninstall(name)
+            if success:
+                runtime.descriptions.pop(name, None)
+                # A reinstall under the same name must not serve results
+                # cached from the old backend.
+                runtime.relay_cache.invalidate(name)
+                runtime.bump_caps_version()
             return {"success": success}
-        finally:
-            runtime.release()
 
     @mcp.tool()
     def list_capabilities() -> list[dict[str, Any]]:
@@ -243,11 +327,17 @@ def create_server(
             - description: Capability description
         """
         logger.debug("list capabilities")
-        runtime.acquire()
-        try:
-            return repl.list_capabilities()
-        finally:
-            runtime.release()
+        # Capabilities only change at install/uninstall/register/reset/
+        # restore, all of which bump the caps version and drop this
+        # cache; polling between mutations costs a dict pointer read.
+        cached = runtime.caps_cache
+        if cached is not None:
+            return cached
+
+        with runtime.read_locked():
+            caps = runtime.repl.list_capabilities()
+        runtime.caps_cache = caps
+        return caps
 
     @mcp.tool()
     def describe_capability(name: str) -> dict[str, Any]:
@@ -263,15 +353,26 @@ def create_server(
             - error: Error message if not found
         """
         logger.debug("describe capability name=%s", name)
-        runtime.acquire()
-        try:
-            result = repl.execute(f"{name}.describe()")
-            if result.success:
-                return {"success": True, "description": result.return_value}
-            else:
-                return {"success": False, "error": f"Capability '{name}' not found or has no describe()"}
-        finally:
-            runtime.release()
+        # Guard before interpolating into an execute string: anything
+        # that is not a plain identifier would otherwise run as code.
+        if not name.isidentifier():
+            return {"success": False, "error": f"Invalid capability name: {name!r}"}
+
+        cached = runtime.descriptions.get(name)
+        if cached is not None:
+            return {"success": True, "description": cached}
+
+        with runtime.read_locked():
+            result = runtime.repl.execute(f"{name}.describe()")
+        if result.success:
+            if isinstance(result.return_value, str):
+                runtime.descriptions[name] = result.return_value
+            return {"success": True, "description": result.return_value}
+        else:
+            return {
+                "success": False,
+                "error": f"Capability '{name}' not found or has no describe()",
+            }
 
     @mcp.tool()
     def save_state(name: str = "default") -> dict[str, Any]:
@@ -292,14 +393,35 @@ def create_server(
             - error: Error message if failed
         """
         logger.info("save state name=%s", name)
-        runtime.acquire()
         try:
-            # Export state from REPL
-            exported = repl.export_state()
+            with runtime.locked():
+                # The REPL only needs to be held for the export itself.
+                exported = runtime.repl.export_state()
 
             # Build saved state from exported data
             from agentself.harness.state import SavedFunction, SavedVariable
 
+            # Both capability kinds land in one list without the
+            # intermediate concat copy; backends is hoisted so the
+            # attribute lookup happens once, not per relay cap.
+            backends = runtime.hub.backends
+            capabilities = [
+                SavedCapability(
+                    name=c["name"],
+                    cap_type="native",
+                    source=c.get("source"),
+                )
+                for c in exported.get("native_capabilities", [])
+            ]
+            capabilities.extend(
+                SavedCapability(
+                    name=c["name"],
+                    cap_type="relay",
+                    command=backends[c["name"]].command if c["name"] in backends else None,
+                )
+                for c in exported.get("relay_capabilities", [])
+            )
+
             state = SavedState(
                 functions=[
                     SavedFunction(
@@ -318,26 +440,12 @@ def create_server(
                     )
                     for v in exported.get("variables", [])
                 ],
-                capabilities=[
-                    SavedCapability(
-                        name=c["name"],
-                        cap_type="native",
-                        source=c.get("source"),
-                    )
-                    for c in exported.get("native_capabilities", [])
-                ] + [
-                    SavedCapability(
-                        name=c["name"],
-                        cap_type="relay",
-                        command=hub.backends[c["name"]].command if c["name"] in hub.backends else None,
-                    )
-                    for c in exported.get("relay_capabilities", [])
-                ],
+                capabilities=capabilities,
                 history=exported.get("history", []),
             )
 
             # Save to disk
-            path = state_manager.save(state, name)
+            path = runtime.state_manager.save(state, name)
             logger.info("saved state name=%s path=%s", name, path)
 
             return {
@@ -353,8 +461,6 @@ def create_server(
         except Exception as e:
             logger.exception("save state failed name=%s", name)
             return {"success": False, "error": str(e)}
-        finally:
-            runtime.release()
 
     @mcp.tool()
     async def restore_state(name: str = "default") -> dict[str, Any]:
@@ -373,79 +479,99 @@ def create_server(
             - error: Error message if failed
         """
         logger.info("restore state name=%s", name)
-        runtime.acquire()
         try:
-            # Load state from disk
-            state = state_manager.load(name)
-            if state is None:
-                return {"success": False, "error": f"No saved state found with name '{name}'"}
-
-            # Build state dict for REPL import
-            import_data = {
-                "functions": [
-                    {
-                        "name": f.name,
-                        "source": f.source,
-                        "signature": f.signature,
-                        "docstring": f.docstring,
-                    }
-                    for f in state.functions
-                ],
-                "variables": [
-                    {
-                        "name": v.name,
-                        "type": v.var_type,
-                        "value": v.value,
-                    }
-                    for v in state.variables
-                ],
-                "native_capabilities": [
-                    {
-                        "name": c.name,
-                        "source": c.source,
-                    }
-                    for c in state.capabilities
-                    if c.cap_type == "native"
-                ],
-                "history": state.history,
-            }
-
-            # Import into REPL
-            result = repl.import_state(import_data)
-
-            # Reconnect relay capabilities
-            relay_reconnects = []
-            relay_failures = []
-            for cap in state.capabilities:
-                if cap.cap_type == "relay" and cap.command:
-                    try:
-                        tools = await hub.install(cap.name, cap.command)
-                        tool_specs = {
-                            t.name: {"description": t.description, "parameters": t.parameters}
-                            for t in tools
-                        }
-                        repl.inject_relay_capability(cap.name, tool_specs)
-                        relay_reconnects.append(cap.name)
-                    except Exception as e:
-                        relay_failures.append({"name": cap.name, "error": str(e)})
-
-            return {
-                "success": True,
-                "summary": {
-                    "functions_restored": result.get("functions_restored", 0),
-                    "functions_failed": result.get("functions_failed", []),
-                    "variables_restored": result.get("variables_restored", 0),
-                    "variables_failed": result.get("variables_failed", []),
-                    "capabilities_restored": result.get("capabilities_restored", 0),
-                    "relay_reconnected": relay_reconnects,
-                    "relay_failed": relay_failures,
-                },
-            }
+            with runtime.locked():
+                return await _restore_locked(name, runtime.repl, runtime.hub)
         except Exception as e:
             logger.exception("restore state failed name=%s", name)
             return {"success": False, "error": str(e)}
-        finally:
-            runtime.release()
+
+    async def _restore_locked(name: str, repl: REPLSubprocess, hub: MCPHub) -> dict[str, Any]:
+        """Body of restore_state, run while holding the runtime lock."""
+        # Load state from disk
+        state = runtime.state_manager.load(name)
+        if state is None:
+            return {"success": False, "error": f"No saved state found with name '{name}'"}
+
+        # Build state dict for REPL import
+        import_data = {
+            "functions": [
+                {
+                    "name": f.name,
+                    "source": f.source,
+                    "signature": f.signature,
+                    "docstring": f.docstring,
+                }
+                for f in state.functions
+            ],
+            "variables": [
+                {
+                    "name": v.name,
+                    "type": v.var_type,
+                    "value": v.value,
+                }
+                for v in state.variables
+            ],
+            "native_capabilities": [
+                {
+                    "name": c.name,
+                    "source": c.source,
+                }
+                for c in state.capabilities
+                if c.cap_type == "native"
+            ],
+            "history": state.history,
+        }
+
+        # Import into REPL
+        result = repl.import_state(import_data)
+
+        # Reconnect relay capabilities. The spawn + handshake per
+        # backend is independent I/O, so all reconnects overlap;
+        # restore waits for the slowest backend instead of the sum.
+        async def _reconnect(cap: SavedCapability) -> tuple[str, Any]:
+            try:
+                tools = await hub.install(cap.name, cap.command)
+                tool_specs = {
+                    t.name: {"description": t.description, "parameters": t.parameters}
+                    for t in tools
+                }
+                repl.inject_relay_capability(cap.name, tool_specs)
+                runtime.descriptions[cap.name] = (
+                    f"MCP-backed capability with tools: {', '.join(t.name for t in tools)}"
+                )
+                return ("ok", cap.name)
+            except Exception as e:
+                return ("fail", {"name": cap.name, "error": str(e)})
+
+        relay_reconnects = []
+        relay_failures = []
+        results = await asyncio.gather(
+            *(
+                _reconnect(cap)
+                for cap in state.capabilities
+                if cap.cap_type == "relay" and cap.command
+            )
+        )
+        for tag, payload in results:
+            if tag == "ok":
+                relay_reconnects.append(payload)
+            else:
+                relay_failures.append(payload)
+
+        runtime.bump_caps_version()
+        return {
+            "success": True,
+            "summary": {
+                "functions_restored": result.get("functions_restored", 0),
+                "functions_failed": result.get("functions_failed", []),
+                "variables_restored": result.get("variables_restored", 0),
+                "variables_failed": result.get("variables_failed", []),
+                "capabilities_restored": result.get("capabilities_restored", 0),
+                "relay_reconnected": relay_reconnects,
+                "relay_failed": relay_failures,
+            },
+        }
 
     @mcp.tool()
     def list_saved_states() -> dict[str, Any]:
@@ -455,11 +581,8 @@ def create_server(
             Dict with list of state names.
         """
         logger.debug("list saved states")
-        runtime.acquire()
-        try:
-            return {"states": state_manager.list_states()}
-        finally:
-            runtime.release()
+        with runtime.read_locked():
+            return {"states": runtime.state_manager.list_states()}
 
     @mcp.tool()
     async def reset() -> dict[str, Any]:
@@ -472,19 +595,30 @@ def create_server(
             Dict with success status.
         """
         logger.info("reset repl")
-        runtime.acquire()
-        try:
+        with runtime.locked():
             # Close hub connections
-            await hub.close()
-
-            # Close and restart REPL
-            repl.close()
-            runtime.repl = REPLSubprocess(relay_handler=runtime.relay_handler)
+            await runtime.hub.close()
+
+            # Swap in a replacement REPL. A pre-warmed spare makes this
+            # O(1); otherwise the spawn + handshake runs on a thread so
+            # the event loop keeps serving other tools. The old process
+            # is also closed off-loop.
+            old = runtime.repl
+            spare = runtime.take_spare()
+            if spare is not None:
+                runtime.repl = spare
+            else:
+                runtime.repl = await asyncio.to_thread(
+                    REPLSubprocess, relay_handler=runtime.relay_handler
+                )
+            runtime.descriptions.clear()
+            runtime.relay_cache.clear()
+            runtime.bump_caps_version()
+            await asyncio.to_thread(old.close)
+            runtime.prewarm_spare()
 
             logger.info("reset repl completed")
             return {"success": True, "message": "REPL reset to clean state"}
-        finally:
-            runtime.release()
 
     return mcp
 
@@ -503,6 +637,19 @@ def get_server(runtime: HarnessRuntime | None = None) -> FastMCP:
 
 def main():
     """Entry point for running the harness as an MCP server."""
+    # CLI-only machinery loads here so importing this module for
+    # embedding (tests, programmatic create_server) stays cheap.
+    import argparse
+    import sys
+    import threading
+    from pathlib import Path
+
+    from agentself.harness.attach_server import AttachServer
+    from agentself.harness.bootstrap import bootstrap_safe
+    from agentself.harness.logging_utils import configure_logging
+    from agentself.harness.mcp_config import install_from_config
+    from agentself.paths import SAFE_ROOT
+
     parser = argparse.ArgumentParser(description="agentself REPL harness")
     parser.add_argument(
         "--profile",
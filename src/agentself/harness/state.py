@@ -8,11 +8,13 @@ from __future__ import annotations
 
 import base64
 import json
+import pickle
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
+from agentself.harness.jsonio import dumps_bytes, loads
 from agentself.paths import STATE_DIR
 
 # Optional dill import for complex object serialization
@@ -40,7 +42,7 @@ class SavedVariable:
     """A serialized variable."""
     name: str
     var_type: str  # "json", "dill", or "repr"
-    value: Any  # JSON value, base64-encoded dill bytes, or repr string
+    value: Any  # JSON value, raw dill bytes, or repr string
 
 
 @dataclass
@@ -152,9 +154,17 @@ class StateManager:
         safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in name)
         return self.state_dir / f"{safe_name}.json"
 
+    def _get_blob_path(self, path: Path) -> Path:
+        """Sidecar file holding raw dill payloads for a state file."""
+        return path.with_suffix(".vars.bin")
+
     def save(self, state: SavedState, name: str = "default") -> Path:
         """Save state to disk.
 
+        The main document is compact JSON (orjson when installed). Raw
+        dill payloads go to a binary sidecar keyed by variable name, so
+        they skip both the base64 4/3 size blow-up and JSON escaping.
+
         Args:
             state: State to save.
             name: Name for the state file.
@@ -164,8 +174,21 @@ class StateManager:
         """
         state.saved_at = datetime.now(timezone.utc).isoformat()
         path = self._get_state_path(name)
-        with open(path, "w") as f:
-            json.dump(state.to_dict(), f, indent=2)
+
+        doc = state.to_dict()
+        blobs: dict[str, bytes] = {}
+        for entry in doc["variables"]:
+            if entry["type"] == "dill" and isinstance(entry["value"], bytes):
+                blobs[entry["name"]] = entry["value"]
+                entry["value"] = None  # payload lives in the sidecar
+
+        blob_path = self._get_blob_path(path)
+        if blobs:
+            blob_path.write_bytes(pickle.dumps(blobs, protocol=pickle.HIGHEST_PROTOCOL))
+        elif blob_path.exists():
+            blob_path.unlink()
+
+        path.write_bytes(dumps_bytes(doc))
         return path
 
     def load(self, name: str = "default") -> SavedState | None:
@@ -180,8 +203,15 @@ class StateManager:
         path = self._get_state_path(name)
         if not path.exists():
             return None
-        with open(path) as f:
-            data = json.load(f)
+        data = loads(path.read_bytes())
+
+        blob_path = self._get_blob_path(path)
+        if blob_path.exists():
+            blobs = pickle.loads(blob_path.read_bytes())
+            for entry in data.get("variables", []):
+                if entry.get("type") == "dill" and entry.get("value") is None:
+                    entry["value"] = blobs.get(entry["name"])
+
         return SavedState.from_dict(data)
 
     def list_states(self) -> list[str]:
@@ -204,6 +234,9 @@ class StateManager:
         path = self._get_state_path(name)
         if path.exists():
             path.unlink()
+            blob_path = self._get_blob_path(path)
+            if blob_path.exists():
+                blob_path.unlink()
             return True
         return False
 
@@ -220,12 +253,12 @@ def serialize_variable(name: str, value: Any) -> SavedVariable:
     except (TypeError, ValueError):
         pass
 
-    # Try dill serialization
+    # Try dill serialization; bytes stay raw and land in the sidecar
+    # file at save time instead of being base64-inflated into JSON.
     if HAS_DILL:
         try:
             pickled = dill.dumps(value)
-            encoded = base64.b64encode(pickled).decode("ascii")
-            return SavedVariable(name=name, var_type="dill", value=encoded)
+            return SavedVariable(name=name, var_type="dill", value=pickled)
         except Exception:
             pass
 
@@ -247,7 +280,10 @@ def deserialize_variable(saved: SavedVariable) -> tuple[str, Any, bool]:
         if not HAS_DILL:
             return (saved.name, "dill not installed", False)
         try:
-            pickled = base64.b64decode(saved.value)
+            pickled = saved.value
+            if isinstance(pickled, str):
+                # Legacy state files carry base64 text inline.
+                pickled = base64.b64decode(pickled)
             value = dill.loads(pickled)
             return (saved.name, value, True)
         except Exception as e:
@@ -1,5 +1,6 @@
 """Tests for the REPL harness."""
 
+import asyncio
 import json
 import socket
 import tempfile
@@ -9,9 +10,16 @@ from pathlib import Path
 
 import pytest
 
+from agentself.harness import jsonio
 from agentself.harness.attach_server import AttachServer, AttachTCPServer
-from agentself.harness.repl import REPLSubprocess, ExecutionResult, REPLState
-from agentself.harness.runtime import create_runtime
+from agentself.harness.repl import (
+    AsyncREPLSubprocess,
+    ExecutionResult,
+    REPLPool,
+    REPLState,
+    REPLSubprocess,
+)
+from agentself.harness.runtime import RelayCache, RWLock, create_runtime
 from agentself.harness.state import StateManager, SavedState, SavedFunction, SavedVariable, SavedCapability
 
 
@@ -81,6 +89,19 @@ class TestREPLSubprocess:
         assert state.defined_functions[0]["name"] == "greet"
         assert "(name)" in state.defined_functions[0]["signature"]
 
+    def test_state_tracks_indirect_bindings(self, repl):
+        """Test that state sees names bound outside top-level assignment."""
+        repl.execute("def bump():\n    global counter\n    counter = 99")
+        repl.execute("bump()")
+        repl.execute("globals().update({'sneaky': [1, 2, 3]})")
+        state = repl.state()
+
+        assert state.variables["counter"] == "int"
+        assert "sneaky" in state.variables
+
+        repl.execute("del sneaky")
+        assert "sneaky" not in repl.state().variables
+
     def test_state_tracks_history(self, repl):
         """Test that state tracks execution history."""
         repl.execute("x = 1")
@@ -140,6 +161,212 @@ average = total / len(data)
         result = repl.execute("injected_var")
         assert result.return_value == "I was injected"
 
+    def test_get_traceback_after_error(self, repl):
+        """Test fetching the full traceback lazily after a failure."""
+        repl.execute("1 / 0")
+        tb = repl.get_traceback()
+
+        assert "ZeroDivisionError" in tb
+
+        repl.execute("x = 1")
+        assert repl.get_traceback() is None
+
+    def test_large_output_truncated(self, repl):
+        """Test that runaway stdout is capped with a truncation marker."""
+        result = repl.execute("print('x' * (2 * 1024 * 1024))")
+
+        assert result.success
+        assert "chars truncated" in result.stdout
+        assert len(result.stdout) < 2 * 1024 * 1024
+
+    def test_snapshot_combines_views(self, repl):
+        """Test the fused state/capabilities/export roundtrip."""
+        repl.execute("x = 7")
+        snap = repl.snapshot()
+
+        assert "x" in snap["state"]["variables"]
+        assert "capabilities" in snap["capabilities"]
+        assert any(v["name"] == "x" for v in snap["export"]["variables"])
+
+    def test_export_state_stream(self, repl):
+        """Test streaming export yields per-record chunks."""
+        repl.execute("x = 1")
+        repl.execute("def f(): return 2")
+        records = list(repl.export_state_stream())
+
+        kinds = {kind for kind, _ in records}
+        assert "variable" in kinds
+        assert "function" in kinds
+        assert any(
+            kind == "variable" and data["name"] == "x" for kind, data in records
+        )
+
+    def test_batch_requests(self, repl):
+        """Test running several requests in one roundtrip."""
+        responses = repl.batch([
+            {"type": "inject", "name": "a", "code": "a = 1"},
+            {"type": "execute", "code": "a + 1"},
+            {"type": "ping"},
+        ])
+
+        assert len(responses) == 3
+        assert responses[0]["success"]
+        assert responses[1]["return_value"] == 2
+        assert responses[2]["pong"]
+
+    def test_send_batch_pipelines_requests(self, repl):
+        """Test pipelined frames: one flush, responses in order."""
+        responses = repl.send_batch([
+            {"type": "execute", "code": "n = 5"},
+            {"type": "execute", "code": "n * 2"},
+            {"type": "state"},
+        ])
+
+        assert len(responses) == 3
+        assert responses[1]["return_value"] == 10
+        assert "n" in responses[2]["variables"]
+
+
+class TestREPLPool:
+    def test_acquire_release_reuses_fresh_repl(self):
+        """Test that released REPLs come back with a clean namespace."""
+        with REPLPool(size=1) as pool:
+            repl = pool.acquire()
+            repl.execute("x = 1")
+            pool.release(repl)
+
+            again = pool.acquire()
+            try:
+                result = again.execute("x")
+                assert not result.success  # namespace was reset
+            finally:
+                pool.release(again)
+
+    def test_acquire_beyond_pool_size(self):
+        """Test that an empty pool still hands out working REPLs."""
+        with REPLPool(size=1) as pool:
+            a = pool.acquire()
+            b = pool.acquire()
+            try:
+                assert a.execute("1 + 1").return_value == 2
+                assert b.execute("2 + 2").return_value == 4
+            finally:
+                pool.release(a)
+                pool.release(b)
+
+
+class TestRelayCache:
+    def test_hit_within_ttl(self):
+        """Test that cached results are returned without expiry."""
+        cache = RelayCache(ttl=60)
+        key = RelayCache.make_key("gmail", "search", {"q": "x"})
+        cache.put(key, "result")
+
+        assert cache.get(key) == "result"
+
+    def test_expiry_and_invalidate(self):
+        """Test TTL expiry and explicit invalidation."""
+        cache = RelayCache(ttl=0.01)
+        key = RelayCache.make_key("fs", "read", {"path": "a"})
+        cache.put(key, "data")
+        time.sleep(0.02)
+        assert cache.get(key) != "data"  # expired
+
+        cache = RelayCache(ttl=60)
+        cache.put(key, "data")
+        cache.invalidate("fs")
+        assert cache.get(key) != "data"
+
+    def test_clear_drops_all_capabilities(self):
+        """Test that clear empties entries across capabilities."""
+        cache = RelayCache(ttl=60)
+        key_a = RelayCache.make_key("fs", "read", {"path": "a"})
+        key_b = RelayCache.make_key("gmail", "search", {"q": "x"})
+        cache.put(key_a, "data")
+        cache.put(key_b, "mail")
+
+        cache.clear()
+        assert cache.get(key_a) != "data"
+        assert cache.get(key_b) != "mail"
+
+    def test_no_cache_hint_skips_insertion(self):
+        """Test that no-cache hinted payloads are never stored."""
+        cache = RelayCache(ttl=60)
+        key = RelayCache.make_key("svc", "now", {})
+        cache.put(key, {"_meta": {"cache_hint": "no-cache"}, "value": 1})
+
+        miss = cache.get(key)
+        assert not isinstance(miss, dict)
+
+
+class TestRWLock:
+    def test_readers_share(self):
+        """Test that two readers hold the lock at the same time."""
+        lock = RWLock()
+        assert lock.acquire_read()
+        assert lock.acquire_read(timeout=0.5)
+        lock.release_read()
+        lock.release_read()
+
+    def test_writer_excludes_readers(self):
+        """Test that a writer blocks readers until released."""
+        lock = RWLock()
+        assert lock.acquire_write()
+        assert not lock.acquire_read(timeout=0.05)
+        lock.release_write()
+        assert lock.acquire_read(timeout=0.5)
+        lock.release_read()
+
+    def test_waiting_writer_blocks_new_readers(self):
+        """Test writer preference: a queued writer stops fresh readers."""
+        lock = RWLock()
+        assert lock.acquire_read()
+        acquired = threading.Event()
+
+        def writer():
+            lock.acquire_write()
+            acquired.set()
+            lock.release_write()
+
+        thread = threading.Thread(target=writer, daemon=True)
+        thread.start()
+        time.sleep(0.05)  # let the writer start waiting
+        assert not lock.acquire_read(timeout=0.05)
+
+        lock.release_read()
+        assert acquired.wait(timeout=1.0)
+        thread.join(timeout=1.0)
+
+
+class TestAsyncREPLSubprocess:
+    def test_execute_and_state(self):
+        """Test the asyncio client end to end on one loop."""
+
+        async def scenario():
+            async with AsyncREPLSubprocess() as repl:
+                result = await repl.execute("x = 20\nx + 1")
+                state = await repl.state()
+                return result, state
+
+        result, state = asyncio.run(scenario())
+        assert result.success
+        assert "x" in state.variables
+
+    def test_concurrent_subprocesses(self):
+        """Test that one loop drives several subprocesses concurrently."""
+
+        async def scenario():
+            async with AsyncREPLSubprocess() as a, AsyncREPLSubprocess() as b:
+                results = await asyncio.gather(
+                    a.execute("1 + 1"),
+                    b.execute("2 + 2"),
+                )
+                return results
+
+        first, second = asyncio.run(scenario())
+        assert first.return_value == 2
+        assert second.return_value == 4
+
 
 class TestRelayCapabilities:
     """Tests for relay capabilities (MCP-backed)."""
@@ -406,6 +633,24 @@ class TestStateManager:
         assert len(loaded.variables) == 1
         assert loaded.variables[0].value == 42
 
+    def test_dill_payloads_use_sidecar(self, state_manager, temp_state_dir):
+        """Test that raw dill bytes round-trip through the binary sidecar."""
+        payload = b"\x80\x04raw-pickle-bytes"
+        state = SavedState(
+            variables=[SavedVariable(name="blob", var_type="dill", value=payload)],
+        )
+
+        path = state_manager.save(state, "binary")
+        sidecar = temp_state_dir / "binary.vars.bin"
+        assert sidecar.exists()
+        assert payload not in path.read_bytes()  # not inlined into the JSON
+
+        loaded = state_manager.load("binary")
+        assert loaded.variables[0].value == payload
+
+        state_manager.delete("binary")
+        assert not sidecar.exists()
+
     def test_load_nonexistent(self, state_manager):
         """Test loading nonexistent state returns None."""
         assert state_manager.load("nonexistent") is None
@@ -481,6 +726,23 @@ def greet(name):
         assert "def greet" in func["source"]
         assert "(name)" in func["signature"]
 
+    def test_export_decorated_function(self, repl):
+        """Test that exported source keeps decorators."""
+        repl.execute("""
+import functools
+
+@functools.lru_cache
+def cached(x):
+    return x * 2
+""")
+
+        exported = repl.export_state()
+
+        func = exported["functions"][0]
+        assert func["name"] == "cached"
+        assert func["source"].startswith("@functools.lru_cache")
+        assert "def cached" in func["source"]
+
     def test_export_history(self, repl):
         """Test that history is exported."""
         repl.execute("x = 1")
@@ -583,6 +845,23 @@ def increment(x):
             assert r.return_value == 11
 
 
+class TestJsonIO:
+    """Tests for the shared JSON IPC helpers."""
+
+    def test_roundtrip(self):
+        """Test that dumps_bytes/loads roundtrip a payload."""
+        payload = {"op": "execute", "code": "1 + 1", "wait": False, "values": [1, 2.5, None]}
+
+        encoded = jsonio.dumps_bytes(payload)
+        assert isinstance(encoded, bytes)
+        assert jsonio.loads(encoded) == payload
+
+    def test_loads_rejects_invalid(self):
+        """Test that invalid JSON raises ValueError."""
+        with pytest.raises(ValueError):
+            jsonio.loads(b"{not json")
+
+
 class TestAttachServer:
     """Tests for the attach server."""
 
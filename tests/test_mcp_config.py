@@ -33,3 +33,20 @@ def test_load_mcp_config_expands_env(tmp_path: Path) -> None:
     assert alpha.args == ["ok"]
     assert alpha.env == {"TOKEN": "ok"}
     assert alpha.cwd == "ok"
+
+
+def test_load_mcp_config_caches_unchanged_file(tmp_path: Path) -> None:
+    path = tmp_path / "mcp.json"
+    path.write_text(json.dumps({"mcpServers": {"alpha": {"command": "echo"}}}), encoding="utf-8")
+
+    first = load_mcp_config(path)
+    assert load_mcp_config(path) is first
+
+    # Rewriting the file invalidates the cached parse.
+    path.write_text(
+        json.dumps({"mcpServers": {"alpha": {"command": "echo"}, "beta": {"command": "true"}}}),
+        encoding="utf-8",
+    )
+    reloaded = load_mcp_config(path)
+    assert reloaded is not first
+    assert {s.name for s in reloaded} == {"alpha", "beta"}